@@ -0,0 +1,138 @@
+# baseline.py — What traffic usually looks like, from the long-term HistoryLog: the same
+# window yesterday or last week, and an hour-of-week mean / p95 envelope.
+#
+# Pure Python and Qt-free; qt_baseline.py loads these in worker processes and
+# keeps them current for the graph.
+
+import math
+import time
+from array import array
+
+from history_log import read_segment
+
+DAY = 86400.0
+WEEK = 7 * DAY
+# Graph compare modes -> how far back the baseline window is.
+SHIFTS = {"day": DAY, "week": WEEK}
+HOURS_PER_WEEK = 168
+
+# The envelope is built from at most this much of the log. Older weeks say
+# little about today and would only make the first build slower.
+ENVELOPE_WEEKS = 4
+
+
+class Envelope:
+    """Mean and p95 of one rate for each local hour of the week (Monday 00:00 = 0).
+
+    Values go into log2-spaced histogram buckets between `lo` and `hi`
+    bytes/s, so memory is fixed however much history is added and p95 is
+    within a bucket (about ±9% at 4 per octave). Samples are weighted by
+    the seconds they cover, so 1 s log records and faster live samples mix.
+    """
+
+    def __init__(self, lo=1 << 10, hi=1 << 34, per_octave=4):
+        self._log_lo = math.log2(lo)
+        self._per_octave = per_octave
+        self.buckets = int((math.log2(hi) - self._log_lo) * per_octave)
+        self._hist = [[0.0] * self.buckets for _ in range(HOURS_PER_WEEK)]
+        self._sum = [0.0] * HOURS_PER_WEEK
+        self._weight = [0.0] * HOURS_PER_WEEK
+        self._stats = None  # (means, p95s), rebuilt after adds
+        self._span = (0.0, 0.0, 0)  # [start, end) of the cached local hour, its hour of week
+
+    def hour_of_week(self, t):
+        start, end, how = self._span
+        if not start <= t < end:
+            # localtime() once per hour of samples; local hours can be
+            # shorter or longer than 3600 s only at a DST change.
+            lt = time.localtime(t)
+            start = t - (lt.tm_min * 60 + lt.tm_sec + (t % 1.0))
+            how = lt.tm_wday * 24 + lt.tm_hour
+            self._span = (start, start + 3600.0, how)
+        return how
+
+    def _bucket(self, rate):
+        if rate <= 0:
+            return 0
+        b = int((math.log2(rate) - self._log_lo) * self._per_octave)
+        return min(max(b, 0), self.buckets - 1)
+
+    def _bucket_value(self, b):
+        # Geometric middle of the bucket.
+        return 2.0 ** (self._log_lo + (b + 0.5) / self._per_octave)
+
+    def add(self, t, rate, weight=1.0):
+        how = self.hour_of_week(t)
+        self._hist[how][self._bucket(rate)] += weight
+        self._sum[how] += rate * weight
+        self._weight[how] += weight
+        self._stats = None
+
+    def merge(self, other):
+        """Fold in another envelope built over a different time range."""
+        for how in range(HOURS_PER_WEEK):
+            mine, theirs = self._hist[how], other._hist[how]
+            for b, w in enumerate(theirs):
+                if w:
+                    mine[b] += w
+            self._sum[how] += other._sum[how]
+            self._weight[how] += other._weight[how]
+        self._stats = None
+
+    def stats(self):
+        """(means, p95s): one entry per hour of week, None where there's no data."""
+        if self._stats is None:
+            means, p95s = [], []
+            for how in range(HOURS_PER_WEEK):
+                total = self._weight[how]
+                if not total:
+                    means.append(None)
+                    p95s.append(None)
+                    continue
+                means.append(self._sum[how] / total)
+                acc, goal = 0.0, total * 0.95
+                for b, w in enumerate(self._hist[how]):
+                    acc += w
+                    if acc >= goal:
+                        break
+                p95s.append(self._bucket_value(b))
+            self._stats = (means, p95s)
+        return self._stats
+
+    def bands(self, t0, t1):
+        """[(start, end, mean, p95), ...] for each local hour overlapping
+        [t0, t1] that has data, oldest first."""
+        means, p95s = self.stats()
+        out = []
+        t = t0
+        while t < t1:
+            how = self.hour_of_week(t)
+            start, end, _ = self._span
+            if means[how] is not None:
+                out.append((max(start, t0), min(end, t1), means[how], p95s[how]))
+            t = end
+        return out
+
+
+# ── Segment Loads ──
+# Each takes one HistoryLog segment path and returns plain picklable data, so
+# qt_baseline.py runs them in worker processes (decoding is pure Python and
+# would hold the GIL against the GUI thread).
+
+
+def segment_envelope(path, fields, t0, t1, field, weight=1.0):
+    """Envelope of `field` over one segment's records within [t0, t1]."""
+    times, cols = read_segment(path, fields, t0, t1)
+    env = Envelope()
+    add = env.add
+    for t, v in zip(times, cols[fields.index(field)]):
+        add(t, v, weight)
+    return env
+
+
+def segment_shifted(path, fields, t0, t1, shift, keep):
+    """(times, columns) of one segment's records within [t0, t1], moved
+    `shift` seconds forward so an older window lines up with now on the
+    graph; only the `keep` fields' columns."""
+    times, cols = read_segment(path, fields, t0, t1)
+    return array("d", [t + shift for t in times]), [cols[fields.index(f)] for f in keep]
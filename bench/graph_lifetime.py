@@ -0,0 +1,103 @@
+# bench/graph_lifetime.py — RSS/CPU of the app with the graph never opened, open, hidden
+# but kept alive (the old behaviour) and closed (window released), plus how
+# long a reopened graph takes to show its full history.
+#
+# Run from the repo root:
+#   python -m bench.graph_lifetime --interval 0.1 --seconds 5
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import psutil
+from PyQt5 import QtCore, QtWidgets
+
+from config import Config
+from main import TinyNetUseWidget
+from sampling import SyntheticCounters
+
+
+def _settle(app):
+    # Run deleteLater()s (WA_DeleteOnClose) so freed windows are really gone.
+    app.processEvents()
+    app.sendPostedEvents(None, QtCore.QEvent.DeferredDelete)
+    app.processEvents()
+
+
+def measure(app, seconds):
+    proc = psutil.Process()
+    cpu0 = sum(proc.cpu_times()[:2])
+    start = time.perf_counter()
+    QtCore.QTimer.singleShot(int(seconds * 1000), app.quit)
+    app.exec_()
+    wall = time.perf_counter() - start
+    cpu = sum(proc.cpu_times()[:2]) - cpu0
+    return 100.0 * cpu / wall, proc.memory_info().rss / (1 << 20)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compare RSS/CPU across graph window lifetimes."
+    )
+    parser.add_argument("--interval", type=float, default=0.1,
+                        help="sample interval in seconds (Settings clamps to >= 0.1)")
+    parser.add_argument("--seconds", type=float, default=5.0,
+                        help="how long to run each phase")
+    parser.add_argument("--heatmap", action="store_true")
+    args = parser.parse_args(argv)
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv[:1])
+    tmp = tempfile.TemporaryDirectory()
+    config = Config(Path(tmp.name) / "config.json")
+    config.data.update(
+        update_interval=args.interval,
+        graph_visible=False,
+        graph_heatmap=args.heatmap,
+        history_log=False,
+    )
+    config.commit()
+
+    widget = TinyNetUseWidget(
+        config=config, source=SyntheticCounters("bursty", rate=20 * (1 << 20))
+    )
+    widget.show()
+
+    rows = []
+    rows.append(("graph never opened", *measure(app, args.seconds)))
+
+    widget.toggle_graph(True)
+    rows.append(("graph open", *measure(app, args.seconds)))
+
+    # The old behaviour: the window stays alive and keeps handling samples.
+    widget.graph_window.hide()
+    rows.append(("graph hidden, kept alive", *measure(app, args.seconds)))
+
+    widget.graph_window.show()
+    widget.toggle_graph(False)
+    _settle(app)
+    rows.append(("graph closed (released)", *measure(app, args.seconds)))
+
+    t0 = time.perf_counter()
+    widget.toggle_graph(True)
+    widget.graph_window.repaint()
+    reopen_ms = (time.perf_counter() - t0) * 1000
+
+    print(f"interval={args.interval}s  phase={args.seconds}s  heatmap={args.heatmap}")
+    print(f"{'phase':<26} {'cpu %':>6} {'rss MB':>7}")
+    for name, cpu, rss in rows:
+        print(f"{name:<26} {cpu:>6.1f} {rss:>7.1f}")
+    print(f"reopen + first paint: {reopen_ms:.1f} ms with {len(widget.history)} samples "
+          f"of history already in place")
+
+    widget.tray.hide()
+    tmp.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+# bench/shm_reads.py — Reads per second from the shared-memory sample segment, with a
+# writer publishing in another process, against polling the OS counters directly.
+#
+# Run from the repo root:
+#   python -m bench.shm_reads --seconds 3 --write-rate 1000
+#
+# The writer fills every field of record i with the value i, so a torn read
+# (fields from two different records) is detectable and counted. It runs as
+# a separate interpreter, not a multiprocessing child, so reader and writer
+# don't share a resource tracker, just like a real external tool.
+
+import argparse
+import subprocess
+import sys
+import threading
+import time
+
+import psutil
+
+from sampling import FIELDS
+from shared_reader import SampleReader
+from shared_samples import SamplePublisher
+
+NAME = "tinynetuse_bench"
+
+
+def _serve(rate):
+    # Publish until stdin closes.
+    pub = SamplePublisher(FIELDS, name=NAME)
+    stop = threading.Event()
+    threading.Thread(target=lambda: (sys.stdin.read(), stop.set()), daemon=True).start()
+    print("ready", flush=True)
+    period = 1.0 / rate if rate else 0.0
+    i = 0
+    deadline = time.perf_counter()
+    while not stop.is_set():
+        i += 1
+        pub.publish(float(i), float(i), (float(i),) * len(FIELDS))
+        if period:
+            deadline += period
+            pause = deadline - time.perf_counter()
+            if pause > 0:
+                time.sleep(pause)
+    pub.close()
+
+
+def _rate(fn, seconds):
+    n = 0
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        for _ in range(100):
+            fn()
+        n += 100
+    return n / seconds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Shared-memory sample reads per second.")
+    parser.add_argument("--seconds", type=float, default=2.0, help="duration of each test")
+    parser.add_argument("--write-rate", type=float, default=1000.0,
+                        help="writer publishes per second (0 = as fast as it can)")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.serve:
+        _serve(args.write_rate)
+        return 0
+
+    writer = subprocess.Popen(
+        [sys.executable, "-m", "bench.shm_reads", "--serve",
+         "--write-rate", str(args.write_rate)],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+    )
+    try:
+        if writer.stdout.readline().strip() != "ready":
+            print("writer did not start", file=sys.stderr)
+            return 1
+        return _measure(args)
+    finally:
+        writer.stdin.close()
+        writer.wait()
+
+
+def _measure(args):
+    reader = SampleReader(NAME)
+    torn = 0
+
+    def checked():
+        nonlocal torn
+        rec = reader.latest_raw()
+        if rec is not None and any(v != rec[0] for v in rec):
+            torn += 1
+
+    rows = [
+        ("latest_raw()", _rate(reader.latest_raw, args.seconds)),
+        ("latest() -> dict", _rate(reader.latest, args.seconds)),
+        ("latest_raw() + tear check", _rate(checked, args.seconds)),
+        ("history(60)", _rate(lambda: reader.history(60), args.seconds)),
+        ("psutil.net_io_counters()", _rate(psutil.net_io_counters, args.seconds)),
+    ]
+    published = reader.count()
+    retries = reader.retries
+    reader.close()
+
+    print(f"writer: {args.write_rate or 'max'} publishes/s, {published} published")
+    print(f"{'read':<28} {'reads/s':>12}")
+    for name, per_s in rows:
+        print(f"{name:<28} {per_s:>12,.0f}")
+    print(f"seqlock retries: {retries}, torn snapshots seen: {torn}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
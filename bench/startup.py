@@ -0,0 +1,160 @@
+# bench/startup.py — Time to first paint with growing amounts of history on disk.
+#
+# Run from the repo root:
+#   python -m bench.startup --days 1 7 28 --retention-days 7
+#
+# Writes a synthetic long-term log (one record per second) once, then for each
+# size starts the overlay and graph in a fresh interpreter (Qt offscreen
+# platform) over the newest N days of it and reports:
+#   overlay / graph   time from constructing the widget to its first paint
+#   filled            time until the history backfill finished
+#   stall             longest gap between 10 ms timer ticks while it ran
+#   blocking          what loading the same history in-process, before the
+#                     first paint, would have delayed it by
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from history_log import HistoryLog, read_segment
+from sampling import FIELDS
+
+
+def _write_log(directory, days, now):
+    log = HistoryLog(directory, retention_days=0)
+    t = now - days * 86400
+    while t < now - 60:
+        hour = t % 86400 / 3600
+        rx = 1e6 * (1 + hour)
+        log.append(t, (rx, rx / 4, rx / 800, rx / 3200, 0.0, 0.0, 0.0, 0.0), 1.0)
+        t += 1.0
+    log.close()
+
+
+def _blocking_load(directory, retention, now):
+    # The in-process equivalent of qt_history_loader: decode every day, newest first.
+    from history import History
+
+    history = History(FIELDS, retention)
+    log = HistoryLog(directory, retention_days=0)
+    start = time.perf_counter()
+    for day in reversed(log.days_between(now - retention, now)):
+        times, cols = read_segment(log.segment_path(day), FIELDS, now - retention, now)
+        if history.first_time is not None:
+            n = sum(1 for t in times if t < history.first_time)
+            times, cols = times[:n], [c[:n] for c in cols]
+        history.prepend(times, cols)
+    return time.perf_counter() - start
+
+
+def _child(config_path, timeout):
+    from PyQt5 import QtCore, QtWidgets
+
+    from config import Config
+    from main import TinyNetUseWidget
+
+    app = QtWidgets.QApplication(sys.argv[:1])
+    first = {}
+
+    class FirstPaint(QtCore.QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QtCore.QEvent.Paint and obj not in first:
+                first[obj] = time.perf_counter()
+            return False
+
+    probe = FirstPaint()
+    ticks = []
+    tick = QtCore.QTimer()
+    tick.timeout.connect(lambda: ticks.append(time.perf_counter()))
+
+    start = time.perf_counter()
+    widget = TinyNetUseWidget(config=Config(config_path))
+    widget.installEventFilter(probe)
+    widget.graph_window.installEventFilter(probe)
+    widget.show()
+    tick.start(10)
+    loader = widget.history_loader
+    done = []
+    loader.finished.connect(lambda: done.append(time.perf_counter()))
+    end = start + timeout
+    while time.perf_counter() < end and not (done and len(first) == 2):
+        app.processEvents()
+        time.sleep(0.001)
+
+    gaps = [b - a for a, b in zip(ticks, ticks[1:])]
+    result = {
+        "overlay_ms": (first.get(widget, end) - start) * 1000,
+        "graph_ms": (first.get(widget.graph_window, end) - start) * 1000,
+        "filled_s": (done[0] if done else end) - start,
+        "stall_ms": max(gaps, default=0.0) * 1000,
+        "records": len(widget.history),
+    }
+    loader.stop()
+    widget.tray.hide()
+    print(json.dumps(result), flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Startup time against history size.")
+    parser.add_argument("--days", type=int, nargs="+", default=[1, 7, 28],
+                        help="days of history on disk for each run")
+    parser.add_argument("--retention-days", type=float, default=7.0,
+                        help="history_retention: how much of it the graph loads")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        _child(args.child, args.timeout)
+        return 0
+
+    now = time.time()
+    retention = args.retention_days * 86400
+    with tempfile.TemporaryDirectory() as tmp:
+        full = Path(tmp) / "full"
+        print(f"writing {max(args.days)} days of history…", flush=True)
+        _write_log(full, max(args.days), now)
+        days = sorted(p.stem for p in full.glob("*.seg"))
+
+        print(f"retention={args.retention_days:g} days")
+        print(f"{'days':>5} {'records':>9} {'overlay ms':>11} {'graph ms':>9} "
+              f"{'filled s':>9} {'stall ms':>9} {'blocking s':>11}")
+        for n in args.days:
+            run = Path(tmp) / f"run{n}"
+            (run / "history").mkdir(parents=True)
+            for day in days[-(n + 1):]:  # n whole days plus today's partial one
+                for suffix in (".seg", ".idx"):
+                    if (full / (day + suffix)).exists():
+                        shutil.copy(full / (day + suffix), run / "history")
+            config = run / "config.json"
+            config.write_text(json.dumps({
+                "graph_visible": True,
+                "history_retention": retention,
+                "history_log_days": 0,
+                "shared_memory": False,
+            }))
+            out = subprocess.run(
+                [sys.executable, "-m", "bench.startup", "--child", str(config),
+                 "--timeout", str(args.timeout)],
+                capture_output=True, text=True,
+            )
+            lines = [l for l in out.stdout.splitlines() if l.startswith("{")]
+            if not lines:
+                print(out.stderr, file=sys.stderr)
+                return 1
+            r = json.loads(lines[-1])
+            blocking = _blocking_load(run / "history", retention, now)
+            print(f"{n:>5} {r['records']:>9} {r['overlay_ms']:>11.1f} {r['graph_ms']:>9.1f} "
+                  f"{r['filled_s']:>9.2f} {r['stall_ms']:>9.1f} {blocking:>11.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+# bench/stress.py — Drives the overlay and graph headlessly with synthetic traffic to find
+# where the display pipeline stops keeping up.
+#
+# Run from the repo root:
+#   python -m bench.stress --shape bursty --interfaces 32 --rates 10 100 1000 5000
+#   python -m bench.stress --interfaces 8 --overlays 8   # one extra overlay per NIC
+#
+# For each sample rate the harness ticks the shared QtSampler (and so TinyNetUseWidget
+# and GraphWindow) on a fixed schedule (QTimer can't go below 1 ms, so it schedules
+# ticks itself) and reports:
+#   dropped   ticks skipped because the previous tick + paint overran its slot
+#   latency   time from taking a sample to the start of the paint that shows it
+#   cpu       process CPU time / wall time over the step
+#   rss       resident memory at the end of the step
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import psutil
+from PyQt5 import QtCore, QtWidgets
+
+from config import Config
+from main import TinyNetUseWidget
+from sampling.synthetic import SHAPES, SyntheticCounters
+
+
+class PaintProbe(QtCore.QObject):
+    """Records sample → paint latency for the watched top-level windows."""
+
+    def __init__(self):
+        super().__init__()
+        self.pending = {}  # window -> time of the oldest sample it hasn't painted
+        self.latencies = []
+
+    def watch(self, w):
+        self.pending[w] = None
+        w.installEventFilter(self)
+
+    def sampled(self, now):
+        for w, t in self.pending.items():
+            if t is None:
+                self.pending[w] = now
+
+    def eventFilter(self, obj, event):
+        if event.type() == QtCore.QEvent.Paint and self.pending.get(obj) is not None:
+            self.latencies.append(time.perf_counter() - self.pending[obj])
+            self.pending[obj] = None
+        return False
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def run_step(app, widget, probe, rate, duration):
+    interval = 1.0 / rate
+    proc = psutil.Process()
+    cpu0 = sum(proc.cpu_times()[:2])
+    probe.latencies.clear()
+    done = dropped = 0
+
+    start = time.perf_counter()
+    end = start + duration
+    deadline = start
+    now = start
+    while now < end:
+        now = time.perf_counter()
+        if now >= deadline:
+            # Slots we've already blown through are dropped, not replayed.
+            missed = int((now - deadline) / interval)
+            dropped += missed
+            deadline += (missed + 1) * interval
+            widget.sampler.sample_now()
+            probe.sampled(now)
+            done += 1
+        app.processEvents()
+        # Sleep off idle time so the CPU column measures work, not spinning.
+        idle = deadline - time.perf_counter()
+        if idle > 0:
+            time.sleep(min(idle, 0.0005))
+
+    wall = time.perf_counter() - start
+    cpu = sum(proc.cpu_times()[:2]) - cpu0
+    lat = probe.latencies
+    return {
+        "rate": rate,
+        "ticks": done,
+        "dropped": dropped,
+        "p50_ms": _percentile(lat, 0.50) * 1000,
+        "p99_ms": _percentile(lat, 0.99) * 1000,
+        "mean_ms": (statistics.fmean(lat) * 1000) if lat else 0.0,
+        "cpu_pct": 100.0 * cpu / wall,
+        "rss_mb": proc.memory_info().rss / (1 << 20),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Stress the display pipeline with synthetic traffic."
+    )
+    parser.add_argument("--shape", choices=SHAPES, default="constant")
+    parser.add_argument("--interfaces", type=int, default=1)
+    parser.add_argument("--rate-bytes", type=float, default=50 * (1 << 20),
+                        help="mean received bytes/s per synthetic interface")
+    parser.add_argument("--rates", type=float, nargs="+",
+                        default=[10, 100, 500, 1000, 2000, 5000],
+                        help="sample rates to step through, in Hz")
+    parser.add_argument("--duration", type=float, default=3.0,
+                        help="seconds per step")
+    parser.add_argument("--no-graph", action="store_true")
+    parser.add_argument("--packets", action="store_true",
+                        help="enable the packet/error/drop series")
+    parser.add_argument("--overlays", type=int, default=0,
+                        help="extra per-interface overlays, sharing the one counter read")
+    args = parser.parse_args(argv)
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv[:1])
+
+    # Throwaway config so the run never touches the user's config.json.
+    tmp = tempfile.TemporaryDirectory()
+    config = Config(Path(tmp.name) / "config.json")
+    config.data["graph_visible"] = not args.no_graph
+    config.data["show_packet_stats"] = args.packets
+    # Don't publish over (or leak) the running app's shared-memory segment.
+    config.data["shared_memory"] = False
+    config.data["overlays"] = [
+        {"name": f"synth{i % args.interfaces}", "interfaces": [f"synth{i % args.interfaces}"]}
+        for i in range(args.overlays)
+    ]
+    config.commit()
+
+    source = SyntheticCounters(
+        args.shape, rate=args.rate_bytes, interfaces=args.interfaces, drop_ratio=0.001
+    )
+    widget = TinyNetUseWidget(config=config, source=source)
+    widget.show()
+
+    # The harness owns the schedule; stop the app's own timer.
+    widget.sampler.stop()
+    probe = PaintProbe()
+    probe.watch(widget)
+    if widget.graph_window is not None:
+        probe.watch(widget.graph_window)
+    for ov in widget.overlays:
+        probe.watch(ov)
+
+    print(f"shape={args.shape} interfaces={args.interfaces} "
+          f"graph={not args.no_graph} packets={args.packets} overlays={args.overlays}")
+    print(f"{'rate Hz':>8} {'ticks':>7} {'dropped':>8} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'cpu %':>6} {'rss MB':>7}")
+    for rate in args.rates:
+        r = run_step(app, widget, probe, rate, args.duration)
+        print(f"{r['rate']:>8.0f} {r['ticks']:>7} {r['dropped']:>8} {r['p50_ms']:>8.2f} "
+              f"{r['p99_ms']:>8.2f} {r['cpu_pct']:>6.1f} {r['rss_mb']:>7.1f}")
+
+    widget.tray.hide()
+    tmp.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
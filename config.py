@@ -1,8 +1,12 @@
-# config.py — Loads and saves config.json. Provides DEFAULTS and the Config class.
+# config.py — Loads and saves config.json. Provides DEFAULTS, Settings and the Config class.
 
+import copy
 import json
 import sys
 from pathlib import Path
+from typing import NamedTuple
+
+from units import UNITS
 
 DEFAULTS = {
     "font": "Segoe UI",
@@ -16,8 +20,13 @@ DEFAULTS = {
     "graph_geometry": None,
     "graph_locked": False,
     "graph_always_on_top": True,
+    "graph_heatmap": False,
     "graph_history": 60,
+    "history_retention": 3600,
+    "history_log": True,
+    "history_log_days": 90,
     "update_interval": 1.0,
+    "interfaces": [],
     "opacity": 0.8,
     "alert_color": "#FF5555",
     "download_color": "#4FC3F7",
@@ -25,10 +34,168 @@ DEFAULTS = {
     "unit": "auto",
     "precision": 1,
     "notify_threshold": {"download": None},
+    "show_packet_stats": False,
+    "talkers_interval": 2.0,
+    "talkers_table_interval": 10.0,
+    "latency_targets": [],
+    "latency_interval": 5.0,
+    "latency_timeout": 2.0,
+    "shared_memory": True,
+    "overlays": [],
     "start_on_boot": False,
 }
 
 
+def _clamped(lo, hi):
+    def check(v):
+        return min(max(v, lo), hi)
+
+    return check
+
+
+def _one_of(choices):
+    def check(v):
+        if v not in choices:
+            raise ValueError(v)
+        return v
+
+    return check
+
+
+def _optional_positive(v):
+    return v if v and v > 0 else None
+
+
+def _strings(v):
+    # Blank entries are dropped; anything else is checked by whoever uses it.
+    return tuple(str(x).strip() for x in v if str(x).strip())
+
+
+class OverlaySpec(NamedTuple):
+    """One extra overlay from the `overlays` list. Style fields left as None
+    follow the main overlay's settings. Geometry and lock state are window
+    state, kept in the raw entry like widget_geometry."""
+
+    name: str
+    interfaces: tuple
+    font_color: str = None
+    font_size: int = None
+    opacity: float = None
+
+
+def _overlay_specs(v):
+    # Never drops an entry, so spec i always matches data["overlays"][i];
+    # bad values fall back to None (= follow the main overlay).
+    specs = []
+    for entry in v:
+        entry = entry if isinstance(entry, dict) else {}
+        style = {}
+        for key, typ, check in (
+            ("font_color", str, None),
+            ("font_size", int, _clamped(6, 72)),
+            ("opacity", float, _clamped(0.0, 1.0)),
+        ):
+            try:
+                raw = entry.get(key)
+                style[key] = None if raw is None else (check or typ)(typ(raw))
+            except (TypeError, ValueError):
+                style[key] = None
+        try:
+            interfaces = _strings(entry.get("interfaces") or ())
+        except TypeError:
+            interfaces = ()
+        name = str(entry.get("name") or f"Overlay {len(specs) + 1}")
+        specs.append(OverlaySpec(name, interfaces, **style))
+    return tuple(specs)
+
+
+# (name, type, check) — the user-editable keys the widgets render from.
+# Types are coerced first; a value that fails coercion or its check falls back
+# to the entry in DEFAULTS.
+_FIELDS = (
+    ("font", str, None),
+    ("font_size", int, _clamped(6, 72)),
+    ("font_color", str, None),
+    ("font_bold", bool, None),
+    ("graph_history", int, _clamped(2, 100_000)),
+    ("history_retention", float, _clamped(60.0, 7 * 86400.0)),
+    ("history_log", bool, None),
+    ("history_log_days", int, _clamped(0, 3650)),
+    ("update_interval", float, _clamped(0.1, 60.0)),
+    ("interfaces", list, _strings),
+    ("opacity", float, _clamped(0.0, 1.0)),
+    ("alert_color", str, None),
+    ("download_color", str, None),
+    ("upload_color", str, None),
+    ("unit", str, _one_of(UNITS)),
+    ("precision", int, _clamped(0, 6)),
+    ("notify_download", float, _optional_positive),
+    ("show_packet_stats", bool, None),
+    ("talkers_interval", float, _clamped(0.5, 60.0)),
+    ("talkers_table_interval", float, _clamped(1.0, 600.0)),
+    ("latency_targets", list, _strings),
+    ("latency_interval", float, _clamped(0.5, 3600.0)),
+    ("latency_timeout", float, _clamped(0.1, 30.0)),
+    ("shared_memory", bool, None),
+    ("overlays", list, _overlay_specs),
+)
+
+
+def _coerce(name, raw, typ, check):
+    v = None if raw is None else typ(raw)
+    if check is not None:
+        return check(v)
+    if v is None:
+        raise ValueError(name)
+    return v
+
+
+class Settings:
+    """Typed, validated snapshot of the settings in config.json.
+
+    Immutable by convention: Config builds a new one on commit() and diffs it
+    against the previous snapshot, so consumers only apply what changed.
+    """
+
+    __slots__ = tuple(name for name, _, _ in _FIELDS)
+
+    @classmethod
+    def from_dict(cls, d):
+        s = cls.__new__(cls)
+        for name, typ, check in _FIELDS:
+            if name == "notify_download":
+                raw = (d.get("notify_threshold") or {}).get("download")
+                default = DEFAULTS["notify_threshold"]["download"]
+            else:
+                raw = d.get(name)
+                default = DEFAULTS[name]
+            try:
+                v = _coerce(name, raw, typ, check)
+            except (TypeError, ValueError):
+                # Checked too, so e.g. a list default comes out as a tuple.
+                v = _coerce(name, default, typ, check)
+            object.__setattr__(s, name, v)
+        return s
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Settings is read-only; edit Config.data and commit()")
+
+    def diff(self, other) -> frozenset:
+        """Names of the fields whose values differ from `other`."""
+        if other is None:
+            return frozenset(self.__slots__)
+        return frozenset(
+            n for n in self.__slots__ if getattr(self, n) != getattr(other, n)
+        )
+
+    def __eq__(self, other):
+        return isinstance(other, Settings) and not self.diff(other)
+
+    def __repr__(self):
+        fields = ", ".join(f"{n}={getattr(self, n)!r}" for n in self.__slots__)
+        return f"Settings({fields})"
+
+
 def _config_path() -> Path:
     # Frozen (PyInstaller --onefile): _MEIPASS is a temp dir that gets wiped on exit,
     # so we put config next to the exe instead. Script mode: next to this file.
@@ -41,7 +208,7 @@ class Config:
     def __init__(self, path=None):
         self.path = Path(path) if path else _config_path()
         if not self.path.exists():
-            self.data = DEFAULTS.copy()
+            self.data = copy.deepcopy(DEFAULTS)
             self.save()
         else:
             try:
@@ -50,10 +217,32 @@ class Config:
             except json.JSONDecodeError:
                 # Corrupt config (bad manual edit, truncated write, etc.) - start fresh.
                 # The broken file gets overwritten on the next save.
-                self.data = DEFAULTS.copy()
+                self.data = copy.deepcopy(DEFAULTS)
             for k, v in DEFAULTS.items():
-                self.data.setdefault(k, v)
+                # Copied: data's lists and dicts get edited in place.
+                self.data.setdefault(k, copy.deepcopy(v))
+        self.settings = Settings.from_dict(self.data)
+        self._listeners = []
 
     def save(self):
         with open(self.path, "w") as f:
             json.dump(self.data, f, indent=2)
+
+    def subscribe(self, callback):
+        """Call `callback(changed)` with the changed field names after each commit()."""
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def commit(self):
+        """Save, re-validate `data` into a new Settings and notify on any changes."""
+        self.save()
+        new = Settings.from_dict(self.data)
+        changed = new.diff(self.settings)
+        self.settings = new
+        if changed:
+            for cb in list(self._listeners):
+                cb(changed)
+        return changed
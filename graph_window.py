@@ -1,19 +1,32 @@
 # graph_window.py — Floating dialog that draws a rolling network speed history graph.
 
-from collections import deque
 import time
 
-import psutil
 from PyQt5 import QtWidgets, QtCore, QtGui
 from PyQt5.QtCore import QRectF, Qt
 
 from config import Config
+from heatmap import Heatmap
+from history import History
+from qt_sampler import QtSampler
+from sampling import FIELDS
+import units
+
+# Wheel notches are 120 units; each notch zooms the visible span by this factor.
+_ZOOM_STEP = 0.8
+
+# Baseline menu entries: (graph_baseline value, label).
+_COMPARE = (("", "Nothing"), ("day", "Yesterday"), ("week", "Last Week"))
+
+# Latency lines, one colour per target in configured order.
+_RTT_COLORS = ("#C5E1A5", "#FFF59D", "#CE93D8", "#80CBC4", "#F48FB1", "#B0BEC5")
 
 
 class GraphWindow(QtWidgets.QDialog):
     closed = QtCore.pyqtSignal()
 
-    def __init__(self, parent=None, config=None):
+    def __init__(self, parent=None, config=None, sampler=None, history=None, latency=None,
+                 baselines=None):
         super().__init__(parent)
         self.config = config or Config()
         d = self.config.data
@@ -24,9 +37,6 @@ class GraphWindow(QtWidgets.QDialog):
         self.resize(600, 320)
         base = Qt.FramelessWindowHint | Qt.Dialog
         flags = base | (Qt.WindowStaysOnTopHint if d.get("graph_always_on_top") else 0)
-
-        # Match main widget opacity
-        self.setWindowOpacity(d.get("opacity", 1.0))
         self.setWindowFlags(flags)
         self.always_on_top = d.get("graph_always_on_top", False)
         self.locked = d.get("graph_locked", False)
@@ -40,25 +50,50 @@ class GraphWindow(QtWidgets.QDialog):
             self._dock_bottom_right()
 
         # ── Data & State ──
-        self.max_history = d.get("graph_history", 60)
-        self.interval = d.get("update_interval", 1.0)
-        self.unit = d.get("unit", "MB/s")
-        self.precision = d.get("precision", 2)
+        s = self.config.settings
         self.bg_color = QtGui.QColor(0, 0, 0, 220)
-        self.line_dl = QtGui.QColor(d.get("download_color", "#4FC3F7"))
-        self.line_ul = QtGui.QColor(d.get("upload_color", "#FF8A65"))
-        cnt = psutil.net_io_counters()
-        self.last_sent, self.last_recv = cnt.bytes_sent, cnt.bytes_recv
-        self.sent_hist = deque([0.0] * self.max_history, maxlen=self.max_history)
-        self.recv_hist = deque([0.0] * self.max_history, maxlen=self.max_history)
-        self.last_dl = 0.0
-        self.last_ul = 0.0
+        self._label_font = None
+        self._label_font_key = None
+        # Raw per-second rates; bytes are converted to the display unit at paint time.
+        # The overlay owns the history and keeps filling it while this window
+        # doesn't exist; a standalone graph keeps its own.
+        self._owns_history = history is None
+        self.history = history if history is not None else History(
+            FIELDS, retention=s.history_retention
+        )
+        self.drop_color = QtGui.QColor("#FF5555")
+        # Download-rate heatmap strip under the line graph (None when hidden).
+        self.heatmap = None
+        if d.get("graph_heatmap", False):
+            self._build_heatmap()
         self.auto_scale = True
 
-        # ── Timer ──
-        self.timer = QtCore.QTimer(self)
-        self.timer.timeout.connect(self._update)
-        self.timer.start(int(self.interval * 1000))
+        # ── View State ──
+        # _view_end None = follow the newest sample; otherwise the pinned right
+        # edge. _view_span None = the default graph_history samples wide.
+        self._view_end = None
+        self._view_span = None
+        self._pan_start = None
+        self._hover_x = None
+        self.setMouseTracking(True)
+
+        # ── Samples ──
+        # Fed by the overlay's QtSampler; a standalone graph gets its own.
+        if sampler is None:
+            sampler = QtSampler(s.update_interval, parent=self, interfaces=s.interfaces)
+            sampler.start()
+        self.sampler = sampler
+        self.sampler.sampled.connect(self._on_sample)
+        # Round-trip times from the overlay's qt_latency.LatencyProber, if any.
+        self.latency = latency
+        if latency is not None:
+            latency.probed.connect(self._on_probe)
+        # The overlay's qt_baseline.Baselines; asked to load whatever the
+        # saved graph_baseline / graph_envelope choice needs.
+        self.baselines = baselines
+        if baselines is not None:
+            baselines.changed.connect(self.update)
+            baselines.configure(d.get("graph_baseline", ""), d.get("graph_envelope", False))
 
         # ── Drag & Resize State ──
         self._drag_offset = None
@@ -67,6 +102,7 @@ class GraphWindow(QtWidgets.QDialog):
 
         # ── Apply Settings ──
         self.apply_settings()
+        self.config.subscribe(self.apply_settings)
 
     def _dock_bottom_right(self):
         ag = QtWidgets.QApplication.primaryScreen().availableGeometry()
@@ -76,45 +112,84 @@ class GraphWindow(QtWidgets.QDialog):
         self.setGeometry(x, y, w, h)
 
     def _swap_colors(self):
-        self.line_dl, self.line_ul = self.line_ul, self.line_dl
-        self.config.data["download_color"] = self.line_dl.name()
-        self.config.data["upload_color"] = self.line_ul.name()
+        d = self.config.data
+        d["download_color"], d["upload_color"] = self.line_ul.name(), self.line_dl.name()
+        self.config.commit()  # apply_settings picks the new colors up
+
+    def _on_sample(self, sample):
+        if self._owns_history:
+            # History trims itself to history_retention seconds.
+            self.history.append(sample.time, sample.rates())
+        if self.heatmap is not None:
+            self.heatmap.add(sample.time, sample.rx)
+        self.update()
+
+    def _on_probe(self, result):
+        self.update()
+
+    def history_backfilled(self, done):
+        """Older history was merged in front of the shared one (see
+        qt_history_loader.py). The heatmap is rebuilt once it's all in."""
+        if done and self.heatmap is not None:
+            self._build_heatmap()
+        self.update()
+
+    def _set_baseline(self, mode, envelope):
+        self.config.data["graph_baseline"] = mode
+        self.config.data["graph_envelope"] = bool(envelope)
+        self.config.save()
+        self.baselines.configure(mode, envelope)
+
+    def _build_heatmap(self):
+        # 360 columns spanning the retained history, backfilled from it.
+        self.heatmap = Heatmap(
+            columns=360, bin_seconds=self.config.settings.history_retention / 360
+        )
+        self.heatmap.extend(*self.history.raw("rx"))
+
+    def _toggle_heatmap(self, on):
+        if on:
+            self._build_heatmap()
+        else:
+            self.heatmap = None  # frees the pixel buffer
+        self.config.data["graph_heatmap"] = bool(on)
         self.config.save()
         self.update()
 
-    def _update(self):
-        now = time.time()
-        elapsed = now - getattr(self, "_last_update_time", now)
-        self._last_update_time = now
+    def _plot_rect(self):
+        rect = self.rect()
+        # Dynamic margins and scaling based on window size
+        base_margin = max(8, min(rect.width(), rect.height()) * 0.02)
+        return (
+            base_margin,
+            base_margin,
+            rect.width() - 2 * base_margin,
+            rect.height() - 2 * base_margin,
+        )
 
-        if elapsed == 0:
-            return
+    def _default_span(self):
+        s = self.config.settings
+        return s.graph_history * s.update_interval
+
+    def _view_range(self):
+        span = self._view_span or self._default_span()
+        end = self._view_end
+        if end is None:
+            end = self.history.last_time or time.time()
+        return end - span, end
+
+    def _set_view(self, end, span):
+        s = self.config.settings
+        span = min(max(span, 5 * s.update_interval), s.history_retention)
+        last = self.history.last_time
+        # Panning or zooming back up to the newest sample resumes live follow.
+        self._view_end = None if last is None or end >= last else end
+        self._view_span = None if span == self._default_span() else span
+        self.update()
 
-        cnt = psutil.net_io_counters()
-        raw_sent = cnt.bytes_sent - self.last_sent
-        raw_recv = cnt.bytes_recv - self.last_recv
-        self.last_sent, self.last_recv = cnt.bytes_sent, cnt.bytes_recv
-
-        # Divide by elapsed so the graph shows per-second rates, not per-tick volumes.
-        sent_bps = raw_sent / elapsed
-        recv_bps = raw_recv / elapsed
-
-        if self.unit == "KB/s":
-            sent = sent_bps / (1 << 10)
-            recv = recv_bps / (1 << 10)
-        elif self.unit == "MB/s":
-            sent = sent_bps / (1 << 20)
-            recv = recv_bps / (1 << 20)
-        else:  # auto and bit-based units: use MB/s scale for the graph
-            sent = sent_bps / (1 << 20)
-            recv = recv_bps / (1 << 20)
-
-        self.last_ul = sent
-        self.last_dl = recv
-
-        # deque handles the max_history cap automatically
-        self.sent_hist.append(sent)
-        self.recv_hist.append(recv)
+    def _reset_view(self):
+        self._view_end = None
+        self._view_span = None
         self.update()
 
     def paintEvent(self, event):
@@ -127,49 +202,167 @@ class GraphWindow(QtWidgets.QDialog):
         path.addRoundedRect(QRectF(rect), 12, 12)
         painter.fillPath(path, self.bg_color)
 
-        # Dynamic margins and scaling based on window size
-        base_margin = max(8, min(rect.width(), rect.height()) * 0.02)
-        oy = base_margin
-        h = rect.height() - 2 * base_margin
-        w = rect.width() - 2 * base_margin
-        ox = base_margin
-
-        # Choose scale
-        all_vals = list(self.sent_hist) + list(self.recv_hist)
-        maxv = max(max(all_vals, default=0.0), 0.001) * 1.2
+        ox, oy, w, h = self._plot_rect()
+
+        if self.heatmap is not None:
+            # Heatmap strip along the bottom: one scaled blit of the NumPy-backed
+            # QImage, however much history it covers.
+            strip = h * 0.35
+            h -= strip + 6
+            target = QRectF(ox, oy + h + 6, w, strip)
+            painter.drawImage(target, self.heatmap.image)
+            painter.setPen(QtGui.QPen(QtGui.QColor("#444"), 1))
+            painter.drawRect(target)
+
+        # Only about one point per horizontal pixel is fetched, however wide
+        # the visible span is (see History.window).
+        t0, t1 = self._view_range()
+        span = t1 - t0
+        win = self.history.window(t0, t1, int(w))
+
+        # Baselines: the shifted window is reduced like the live series and
+        # the envelope bands are cached per hour, so neither costs more per
+        # paint than the live lines do.
+        bl = self.baselines
+        bwin = bands = None
+        if bl is not None:
+            if bl.mode and len(bl.shifted):
+                bwin = bl.shifted.window(t0, t1, int(w))
+            if bl.show_envelope:
+                bands = bl.bands(t0, t1)
+
+        # Choose scale (in raw bytes/s; only the labels depend on the unit)
+        peak = max(max(win.maxs["rx"], default=0.0), max(win.maxs["tx"], default=0.0))
+        if bwin is not None:
+            peak = max(peak, max(bwin.maxs["rx"], default=0.0), max(bwin.maxs["tx"], default=0.0))
+        if bands:
+            peak = max(peak, max((p95 for a, b, _, p95 in bands if b > t0 and a < t1), default=0.0))
+        maxv = max(peak, 1.0) * 1.2
+        y_per_raw = h / maxv
 
         # Dynamic line thickness (1 to 3 pixels)
         line_thickness = max(1, min(3, rect.width() * 0.005))  # 0.5% of width
         dash_thickness = max(0.5, line_thickness * 0.5)
 
         # Draw graph lines
-        def draw_series(data, color):
-            painter.setPen(QtGui.QPen(color, line_thickness))
-            points = []
-            for i, v in enumerate(data):
-                x = ox + i * (w / (len(data) - 1))
-                y = oy + h - (v / maxv) * h
-                points.append(QtCore.QPointF(x, y))
+        def x_of(times):
+            return [ox + (t - t0) / span * w for t in times]
+
+        xs = x_of(win.times)
+        base = oy + h
+        thin = max(1.0, line_thickness * 0.5)
+
+        def draw_series(field, pen, y_scale, win=win, xs=xs):
+            painter.setPen(pen)
+            if win.level == 0:
+                points = [
+                    QtCore.QPointF(x, base - v * y_scale)
+                    for x, v in zip(xs, win.mins[field])
+                ]
+            else:
+                # Zig-zag through each block's max and min so spikes survive
+                # the reduction.
+                points = []
+                for x, lo, hi in zip(xs, win.mins[field], win.maxs[field]):
+                    points.append(QtCore.QPointF(x, base - hi * y_scale))
+                    points.append(QtCore.QPointF(x, base - lo * y_scale))
             if len(points) > 1:
                 painter.drawPolyline(*points)
 
-        draw_series(self.recv_hist, self.line_dl)
-        draw_series(self.sent_hist, self.line_ul)
+        painter.save()
+        painter.setClipRect(QRectF(ox, oy, w, h))
+        if bands:
+            # Typical download range for each hour: a faint block up to the
+            # p95 with the mean as a dotted line across it.
+            fill = QtGui.QColor(self.line_dl)
+            fill.setAlpha(28)
+            mean_color = QtGui.QColor(self.line_dl)
+            mean_color.setAlpha(110)
+            painter.setPen(QtGui.QPen(mean_color, thin, Qt.DotLine))
+            for a, b, mean, p95 in bands:
+                xa, xb = x_of((max(a, t0), min(b, t1)))
+                if xb <= xa:
+                    continue
+                painter.fillRect(QRectF(xa, base - p95 * y_per_raw, xb - xa, p95 * y_per_raw), fill)
+                y = base - mean * y_per_raw
+                painter.drawLine(QtCore.QPointF(xa, y), QtCore.QPointF(xb, y))
+        if bwin is not None:
+            bxs = x_of(bwin.times)
+            for field, color in (("rx", self.line_dl), ("tx", self.line_ul)):
+                faint = QtGui.QColor(color)
+                faint.setAlpha(80)
+                draw_series(field, QtGui.QPen(faint, line_thickness), y_per_raw, bwin, bxs)
+        draw_series("rx", QtGui.QPen(self.line_dl, line_thickness), y_per_raw)
+        draw_series("tx", QtGui.QPen(self.line_ul, line_thickness), y_per_raw)
+        show_packets = self.config.settings.show_packet_stats
+        if show_packets:
+            # Packet rates get their own scale (thin dotted lines); ticks along
+            # the bottom mark any sample with drops or errors.
+            pkt_peak = max(max(win.maxs["rx_pkts"], default=0.0),
+                           max(win.maxs["tx_pkts"], default=0.0))
+            y_per_pkt = h / (max(pkt_peak, 1.0) * 1.2)
+            draw_series("rx_pkts", QtGui.QPen(self.line_dl, thin, Qt.DotLine), y_per_pkt)
+            draw_series("tx_pkts", QtGui.QPen(self.line_ul, thin, Qt.DotLine), y_per_pkt)
+            painter.setPen(QtGui.QPen(self.drop_color, 2))
+            bad = zip(xs, win.maxs["dropin"], win.maxs["dropout"],
+                      win.maxs["errin"], win.maxs["errout"])
+            for x, *counts in bad:
+                if any(counts):
+                    painter.drawLine(QtCore.QPointF(x, base), QtCore.QPointF(x, base - 6))
+
+        # Latency: one thin line per probe target on its own axis (right-hand
+        # side), with a tick along the top wherever a probe was lost.
+        rtt = []
+        if self.latency is not None:
+            for i, (target, hist) in enumerate(self.latency.histories.items()):
+                if len(hist):
+                    rwin = hist.window(t0, t1, int(w))
+                    rtt.append((target, _RTT_COLORS[i % len(_RTT_COLORS)], rwin, x_of(rwin.times)))
+        rtt_top = max(
+            (max(rwin.maxs["rtt"], default=0.0) for _, _, rwin, _ in rtt), default=0.0
+        )
+        rtt_top = max(rtt_top, 0.001) * 1.2
+        for target, color, rwin, rxs in rtt:
+            draw_series(
+                "rtt", QtGui.QPen(QtGui.QColor(color), thin, Qt.DashLine), h / rtt_top, rwin, rxs
+            )
+            painter.setPen(QtGui.QPen(self.drop_color, 2))
+            for x, lost in zip(rxs, rwin.maxs["lost"]):
+                if lost:
+                    painter.drawLine(QtCore.QPointF(x, oy), QtCore.QPointF(x, oy + 6))
+        painter.restore()
 
         # Dynamic font size (6 to 12 points)
-        font_size = max(6, min(12, rect.width() * 0.02))  # 2% of width
-        font = QtGui.QFont(self.config.data.get("font", "Segoe UI"), int(font_size))
-        font.setBold(self.config.data.get("font_bold", False))
-        painter.setFont(font)
-
-        # Calculate label positions
-        y_dl = oy + h - (self.last_dl / maxv) * h
-        y_ul = oy + h - (self.last_ul / maxv) * h
-
-        # Format labels with dynamic precision
-        precision = self.precision
-        dl_label = f"↓ {self.last_dl:.{precision}f} {self.unit}"
-        ul_label = f"↑ {self.last_ul:.{precision}f} {self.unit}"
+        font_size = int(max(6, min(12, rect.width() * 0.02)))  # 2% of width
+        s = self.config.settings
+        key = (s.font, s.font_bold, font_size)
+        if key != self._label_font_key:
+            # Only rebuilt on resize or font change, not on every paint.
+            self._label_font = QtGui.QFont(s.font, font_size)
+            self._label_font.setBold(s.font_bold)
+            self._label_font_key = key
+        painter.setFont(self._label_font)
+
+        if rtt:
+            # Right-hand latency axis: full-scale value at the top, 0 at the bottom.
+            painter.setPen(QtGui.QPen(QtGui.QColor("#666"), 1))
+            painter.drawLine(QtCore.QPointF(ox + w, oy), QtCore.QPointF(ox + w, oy + h))
+            painter.setPen(QtGui.QPen(QtGui.QColor("#aaa")))
+            top = QRectF(ox, oy, w - 4, h)
+            painter.drawText(top, Qt.AlignRight | Qt.AlignTop, f"{rtt_top * 1000:.0f} ms")
+            painter.drawText(top, Qt.AlignRight | Qt.AlignBottom, "0 ms")
+
+        # Calculate label positions (latest rates, clamped in case the view is
+        # panned back to a quieter period)
+        latest = self.history.latest()
+        last_dl, last_ul = latest[1][:2] if latest else (0.0, 0.0)
+        y_dl = max(oy, oy + h - last_dl * y_per_raw)
+        y_ul = max(oy, oy + h - last_ul * y_per_raw)
+
+        # Same formatter as the overlay, so both always agree on unit and digits
+        text = units.formatter(s.unit, s.precision).text
+        dl_label = f"↓ {text(last_dl)}"
+        ul_label = f"↑ {text(last_ul)}"
 
         # Draw download speed (left side)
         painter.setPen(QtGui.QPen(self.line_dl, dash_thickness, QtCore.Qt.DashLine))
@@ -191,6 +384,42 @@ class GraphWindow(QtWidgets.QDialog):
         painter.setPen(QtGui.QPen(self.line_ul))
         painter.drawText(ul_rect, Qt.AlignCenter, ul_label)
 
+        # Hover readout: exact rates of the sample nearest the cursor
+        if self._hover_x is not None and ox <= self._hover_x <= ox + w:
+            hit = self.history.nearest(t0 + (self._hover_x - ox) / w * span)
+            if hit is not None and t0 <= hit[0] <= t1:
+                ht, values = hit
+                rx, tx, rx_pkts, tx_pkts = values[:4]
+                hx = ox + (ht - t0) / span * w
+                painter.setPen(QtGui.QPen(QtGui.QColor("#888"), 1, QtCore.Qt.DotLine))
+                painter.drawLine(QtCore.QPointF(hx, oy), QtCore.QPointF(hx, oy + h))
+                stamp = time.strftime("%H:%M:%S", time.localtime(ht))
+                readout = f"{stamp}  ↓ {text(rx)}  ↑ {text(tx)}"
+                if show_packets:
+                    avg = (rx + tx) / (rx_pkts + tx_pkts) if rx_pkts + tx_pkts else 0.0
+                    readout += f"  {rx_pkts + tx_pkts:.0f} pkt/s, {avg:.0f} B avg"
+                if bwin is not None:
+                    then = bl.shifted.nearest(ht)
+                    if then is not None and t0 <= then[0] <= t1:
+                        label = dict(_COMPARE)[bl.mode]
+                        readout += f"\n{label}  ↓ {text(then[1][0])}  ↑ {text(then[1][1])}"
+                for a, b, mean, p95 in bands or ():
+                    if a <= ht < b:
+                        readout += f"\nTypical  ↓ {text(mean)} (p95 {text(p95)})"
+                # One line per probe target, from the probe nearest the cursor.
+                for target, _, _, _ in rtt:
+                    probe = self.latency.histories[target].nearest(ht)
+                    if probe is not None and t0 <= probe[0] <= t1:
+                        rtt_s, lost = probe[1]
+                        readout += f"\n{target}  " + ("lost" if lost else f"{rtt_s * 1000:.1f} ms")
+                r = painter.fontMetrics().boundingRect(QtCore.QRect(), 0, readout)
+                r.adjust(-4, -2, 4, 2)
+                left = hx + 6 if hx + 6 + r.width() <= ox + w else hx - 6 - r.width()
+                r.moveTo(int(left), int(oy + h / 2))
+                painter.fillRect(r, QtGui.QColor(0, 0, 0, 200))
+                painter.setPen(QtGui.QPen(QtGui.QColor("#ddd")))
+                painter.drawText(r, Qt.AlignLeft | Qt.AlignVCenter, readout)
+
         # Border
         painter.setPen(QtGui.QPen(QtGui.QColor("#444"), 2))
         painter.drawRoundedRect(QRectF(rect).adjusted(1, 1, -1, -1), 12, 12)
@@ -203,7 +432,36 @@ class GraphWindow(QtWidgets.QDialog):
                 self.width() - i, self.height(), self.width(), self.height() - i
             )
 
+    def wheelEvent(self, e):
+        steps = e.angleDelta().y() / 120
+        if not steps:
+            return
+        # Zoom about the cursor: the time under it stays put.
+        ox, _, w, _ = self._plot_rect()
+        t0, t1 = self._view_range()
+        frac = min(max((e.pos().x() - ox) / w, 0.0), 1.0)
+        anchor = t0 + frac * (t1 - t0)
+        new_span = (t1 - t0) * _ZOOM_STEP**steps
+        self._set_view(anchor + (1 - frac) * new_span, new_span)
+
+    def mouseDoubleClickEvent(self, e):
+        if e.button() == Qt.LeftButton:
+            self._reset_view()
+
+    def leaveEvent(self, e):
+        self._hover_x = None
+        self.update()
+
     def mousePressEvent(self, e):
+        # Middle-drag or Shift+drag pans the history (allowed even when locked,
+        # since it doesn't move the window).
+        if e.button() == Qt.MiddleButton or (
+            e.button() == Qt.LeftButton and e.modifiers() & Qt.ShiftModifier
+        ):
+            t0, t1 = self._view_range()
+            self._pan_start = (e.x(), t1, t1 - t0)
+            self.setCursor(Qt.ClosedHandCursor)
+            return
         if e.button() == Qt.LeftButton and not self.locked:
             pos = e.pos()
             grip = 16
@@ -219,6 +477,14 @@ class GraphWindow(QtWidgets.QDialog):
             self.width() - grip_size < e.x() < self.width()
             and self.height() - grip_size < e.y() < self.height()
         )
+        if self._pan_start is not None:
+            x0, end, span = self._pan_start
+            _, _, w, _ = self._plot_rect()
+            self._set_view(end - (e.x() - x0) / w * span, span)
+            return
+        if self._hover_x != e.x():
+            self._hover_x = e.x()
+            self.update()
         if self._resizing:
             start_pos, geom = self._resize_start
             dx = e.globalX() - start_pos.x()
@@ -233,6 +499,10 @@ class GraphWindow(QtWidgets.QDialog):
             self.setCursor(Qt.ArrowCursor)
 
     def mouseReleaseEvent(self, e):
+        if self._pan_start is not None:
+            self._pan_start = None
+            self.setCursor(Qt.ArrowCursor)
+            return
         if self._resizing:
             self._resizing = False
         if self._drag_offset:
@@ -255,6 +525,31 @@ class GraphWindow(QtWidgets.QDialog):
         swap_colors = QtWidgets.QAction("Swap Colors", self)
         swap_colors.triggered.connect(self._swap_colors)
         menu.addAction(swap_colors)
+        heat = QtWidgets.QAction("Show Heatmap", self, checkable=True)
+        heat.setChecked(self.heatmap is not None)
+        heat.triggered.connect(self._toggle_heatmap)
+        menu.addAction(heat)
+        if self.baselines is not None:
+            compare = menu.addMenu("Compare With")
+            group = QtWidgets.QActionGroup(compare)
+            for mode, label in _COMPARE:
+                act = compare.addAction(label)
+                act.setCheckable(True)
+                act.setChecked((self.baselines.mode or "") == mode)
+                act.triggered.connect(
+                    lambda _, m=mode: self._set_baseline(m, self.baselines.show_envelope)
+                )
+                group.addAction(act)
+            typical = QtWidgets.QAction("Show Typical Range", self, checkable=True)
+            typical.setChecked(self.baselines.show_envelope)
+            typical.triggered.connect(
+                lambda on: self._set_baseline(self.baselines.mode or "", on)
+            )
+            menu.addAction(typical)
+        live = QtWidgets.QAction("Reset Zoom", self)
+        live.setEnabled(self._view_end is not None or self._view_span is not None)
+        live.triggered.connect(self._reset_view)
+        menu.addAction(live)
         menu.addSeparator()
         menu.addAction("Close", self.close)
         menu.exec_(event.globalPos())
@@ -275,33 +570,34 @@ class GraphWindow(QtWidgets.QDialog):
         self.config.data["graph_locked"] = self.locked
         self.config.save()
 
-    def apply_settings(self):
-        d = self.config.data
-        self.interval = d.get("update_interval", 1.0)
-        self.timer.setInterval(int(self.interval * 1000))
-        new_max = d.get("graph_history", 60)
-        if new_max != self.max_history:
-            # Rebuild deques at the new size, keeping the most recent samples.
-            sent = list(self.sent_hist)[-new_max:]
-            recv = list(self.recv_hist)[-new_max:]
-            while len(sent) < new_max:
-                sent.insert(0, 0.0)
-                recv.insert(0, 0.0)
-            self.max_history = new_max
-            self.sent_hist = deque(sent, maxlen=new_max)
-            self.recv_hist = deque(recv, maxlen=new_max)
-        self.unit = d.get("unit", "MB/s")
-        self.precision = d.get("precision", 2)
-        self.font = d.get("font", "Segoe UI")
-        self.font_bold = d.get("font_bold", False)
-        self.font_size = d.get("font_size", 10)
-        self.setWindowOpacity(d.get("opacity", 1.0))
-        self.line_dl = QtGui.QColor(d.get("download_color", "#4FC3F7"))
-        self.line_ul = QtGui.QColor(d.get("upload_color", "#FF8A65"))
-        self.update()
+    def apply_settings(self, changed=None):
+        # Same contract as TinyNetUseWidget.apply_settings: only touch what changed.
+        s = self.config.settings
+        every = changed is None
+        if every or "history_retention" in changed:
+            if self._owns_history:
+                self.history.retention = s.history_retention
+            if not every and self.heatmap is not None:
+                self._build_heatmap()
+        if every or "opacity" in changed:
+            self.setWindowOpacity(s.opacity)
+        if every or "download_color" in changed:
+            self.line_dl = QtGui.QColor(s.download_color)
+        if every or "upload_color" in changed:
+            self.line_ul = QtGui.QColor(s.upload_color)
+        if every or changed - {"font_size", "font_color"}:
+            self.update()
 
     def closeEvent(self, event):
-        self.timer.stop()
+        try:
+            self.sampler.sampled.disconnect(self._on_sample)
+            if self.latency is not None:
+                self.latency.probed.disconnect(self._on_probe)
+            if self.baselines is not None:
+                self.baselines.changed.disconnect(self.update)
+        except TypeError:
+            pass  # already disconnected by an earlier close
+        self.config.unsubscribe(self.apply_settings)
         self.config.data["graph_visible"] = False
         self.config.save()
         self.closed.emit()  # Emit signal to notify main widget
@@ -0,0 +1,118 @@
+# heatmap.py — Time × rate-bucket heatmap of throughput, rendered from a NumPy buffer.
+
+import math
+
+import numpy as np
+from PyQt5 import QtGui
+
+# Colour stops (position, ARGB) for the intensity LUT: transparent when a
+# bucket is empty, then dark purple → orange → pale yellow.
+_STOPS = (
+    (0.0, (0, 0, 0, 0)),
+    (0.01, (200, 40, 10, 80)),
+    (0.35, (230, 120, 30, 130)),
+    (0.7, (240, 240, 120, 60)),
+    (1.0, (255, 255, 255, 210)),
+)
+
+
+def _lut():
+    pos = np.linspace(0.0, 1.0, 256)
+    xs = [p for p, _ in _STOPS]
+    chans = [np.interp(pos, xs, [c[i] for _, c in _STOPS]) for i in range(4)]
+    a, r, g, b = (np.round(c).astype(np.uint32) for c in chans)
+    return (a << 24) | (r << 16) | (g << 8) | b
+
+
+class Heatmap:
+    """Rolling histogram: one column per `bin_seconds`, one row per rate bucket.
+
+    Buckets are log2-spaced between `lo` and `hi` bytes/s. Pixels live in a
+    preallocated uint32 array that a QImage wraps without copying, so a
+    repaint is a single drawImage() whatever the width. Each sample only
+    recolours its own column; a new column shifts the array once.
+    """
+
+    def __init__(self, columns=360, rows=48, bin_seconds=10.0, lo=1 << 10, hi=1 << 30):
+        self.columns = columns
+        self.rows = rows
+        self.bin_seconds = float(bin_seconds)
+        self._log_lo = math.log2(lo)
+        self._rows_per_octave = rows / (math.log2(hi) - self._log_lo)
+        self._lut = _lut()
+        self.pixels = np.zeros((rows, columns), dtype=np.uint32)
+        self._counts = np.zeros(rows, dtype=np.uint32)  # current column only
+        self._col = None  # absolute bin index of the rightmost column
+        # Format_ARGB32 reads native-endian uint32 0xAARRGGBB, matching _lut.
+        self.image = QtGui.QImage(
+            self.pixels.data, columns, rows, columns * 4, QtGui.QImage.Format_ARGB32
+        )
+
+    def _bucket(self, rate):
+        if rate <= 0:
+            return 0
+        b = int((math.log2(rate) - self._log_lo) * self._rows_per_octave)
+        return min(max(b, 0), self.rows - 1)
+
+    def add(self, t, rate):
+        col = int(t // self.bin_seconds)
+        if self._col is None:
+            self._col = col
+        elif col > self._col:
+            self._advance(col - self._col)
+            self._col = col
+        elif col < self._col:
+            return  # older than the visible window; ignore
+        self._counts[self._bucket(rate)] += 1
+        self._paint_column()
+
+    def extend(self, times, rates):
+        """Backfill from existing history (e.g. when the graph is reopened)."""
+        if self._col is not None:
+            for t, r in zip(times, rates):
+                self.add(t, r)
+            return
+        # Empty heatmap: bin every sample at once instead of painting each
+        # column once per sample; days of history take milliseconds.
+        times = np.asarray(times, dtype=np.float64)
+        if not len(times):
+            return
+        rates = np.asarray(rates, dtype=np.float64)
+        cols = (times // self.bin_seconds).astype(np.int64)
+        last = int(cols[-1])
+        keep = cols > last - self.columns
+        cols, rates = cols[keep] - (last - self.columns + 1), rates[keep]
+        with np.errstate(divide="ignore"):
+            rows = (np.log2(rates) - self._log_lo) * self._rows_per_octave
+        rows = np.where(rates > 0, np.clip(rows, 0, self.rows - 1), 0).astype(np.intp)
+        counts = np.bincount(cols * self.rows + rows, minlength=self.columns * self.rows)
+        counts = counts.reshape(self.columns, self.rows).astype(np.uint32)
+        peak = np.maximum(counts.max(axis=1, keepdims=True), 1)
+        level = np.where(counts > 0, 1 + counts * 254 // peak, 0).astype(np.intp)
+        self.pixels[::-1, :] = self._lut[level].T
+        self._counts[:] = counts[-1]
+        self._col = last
+
+    def clear(self):
+        self.pixels.fill(0)
+        self._counts.fill(0)
+        self._col = None
+
+    def _advance(self, n):
+        if n >= self.columns:
+            self.pixels.fill(0)
+        else:
+            # In-place shift; the QImage keeps pointing at the same buffer.
+            self.pixels[:, :-n] = self.pixels[:, n:]
+            self.pixels[:, -n:] = 0
+        self._counts.fill(0)
+
+    def _paint_column(self):
+        counts = self._counts
+        peak = counts.max()
+        if not peak:
+            return
+        # Any non-empty bucket gets at least level 1 so single hits still show.
+        level = np.where(counts > 0, 1 + counts * 254 // peak, 0).astype(np.intp)
+        # Row 0 is the top of the image, i.e. the highest bucket.
+        self.pixels[::-1, -1] = self._lut[level]
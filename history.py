@@ -0,0 +1,232 @@
+# history.py — Time-indexed sample history with min/max level-of-detail (LOD) levels.
+
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import NamedTuple
+
+import numpy as np
+
+# Level k holds the min/max of blocks of 2**k samples. 24 levels covers
+# ~16M samples per block, far beyond any retention we keep in memory.
+_MAX_LEVELS = 24
+
+
+class Window(NamedTuple):
+    """A slice of history reduced to roughly `max_points` points per series.
+
+    At level 0 `mins` and `maxs` are the same raw values; above that each
+    point is the min/max envelope of one block, starting at `times[i]`.
+    """
+
+    level: int
+    times: list
+    mins: dict
+    maxs: dict
+
+
+class History:
+    """Time-ordered samples kept for `retention` seconds.
+
+    Samples are plain float arrays indexed by a global sample counter, so the
+    time index is a binary search and LOD blocks never need re-aligning when
+    old samples are trimmed off the front.
+    """
+
+    def __init__(self, fields, retention=3600.0):
+        self.fields = tuple(fields)
+        self.retention = float(retention)
+        self._times = array("d")
+        self._cols = [array("d") for _ in self.fields]
+        self._start = 0  # global index of _times[0]
+        # _levels[k - 1] = [first block index, mins per field, maxs per field]
+        self._levels = []
+
+    def __len__(self):
+        return len(self._times)
+
+    @property
+    def first_time(self):
+        return self._times[0] if self._times else None
+
+    @property
+    def last_time(self):
+        return self._times[-1] if self._times else None
+
+    def append(self, t, values):
+        if self._times and t < self._times[-1]:
+            raise ValueError("history samples must be appended in time order")
+        g = self._start + len(self._times)
+        self._times.append(t)
+        for col, v in zip(self._cols, values):
+            col.append(v)
+
+        # Sample g closes one block on every level where g + 1 is a multiple
+        # of the block size, so this is O(1) amortised.
+        k = 1
+        while k <= _MAX_LEVELS and (g + 1) % (1 << k) == 0:
+            self._complete_block(k, g >> k)
+            k += 1
+        self._trim(t)
+
+    def prepend(self, times, columns):
+        """Insert older samples in front of the history.
+
+        `times` is ascending and ends at or before first_time, `columns` holds
+        one sequence of values per field. Samples keep their global indices,
+        so existing LOD blocks stay valid and only blocks made of the new
+        samples (plus the ones they complete at the boundary) are built;
+        nothing already loaded is recomputed. Inserting at the front still
+        moves every sample (and block) already held, so a chunk costs
+        O(len(times) + len(self)) and merging N chunks one by one is
+        quadratic in N, cheap per sample as that move is a memmove.
+        """
+        m = len(times)
+        if not m:
+            return
+        if self._times and times[-1] > self._times[0]:
+            raise ValueError("prepended samples must be older than the history")
+        self._times[0:0] = array("d", times)
+        for col, values in zip(self._cols, columns):
+            col[0:0] = array("d", values)
+        self._start -= m
+        start, end = self._start, self._start + len(self._times)
+
+        for k in range(1, _MAX_LEVELS + 1):
+            lo = -(-start >> k)  # first block that lies wholly inside the history
+            hi = end >> k  # complete blocks only
+            lvl = self._levels[k - 1] if k <= len(self._levels) else None
+            if lvl is not None and lvl[0] is not None:
+                hi = min(hi, lvl[0])
+            if hi <= lo:
+                break  # no new blocks here means none on the levels above
+            if k == 1:
+                srcs = [(np.frombuffer(c), np.frombuffer(c)) for c in self._cols]
+                i0 = 2 * lo - start
+            else:
+                off, cmins, cmaxs = self._levels[k - 2]
+                srcs = [(np.frombuffer(a), np.frombuffer(b)) for a, b in zip(cmins, cmaxs)]
+                i0 = 2 * lo - off
+            i1 = i0 + 2 * (hi - lo)
+            mins = [np.minimum(a[i0:i1:2], a[i0 + 1:i1:2]) for a, _ in srcs]
+            maxs = [np.maximum(b[i0:i1:2], b[i0 + 1:i1:2]) for _, b in srcs]
+            del srcs  # release the buffer exports before resizing the arrays
+
+            if lvl is None:
+                lvl = [None, [array("d") for _ in self.fields], [array("d") for _ in self.fields]]
+                self._levels.append(lvl)
+            for a, v in zip(lvl[1], mins):
+                a[0:0] = array("d", v.tobytes())
+            for a, v in zip(lvl[2], maxs):
+                a[0:0] = array("d", v.tobytes())
+            lvl[0] = lo
+
+    def latest(self):
+        """(time, values) of the newest sample, or None when empty."""
+        if not self._times:
+            return None
+        return self._times[-1], tuple(col[-1] for col in self._cols)
+
+    def nearest(self, t):
+        """(time, values) of the sample closest to `t`, or None when empty."""
+        times = self._times
+        if not times:
+            return None
+        i = bisect_left(times, t)
+        if i == len(times) or (i > 0 and t - times[i - 1] <= times[i] - t):
+            i -= 1
+        return times[i], tuple(col[i] for col in self._cols)
+
+    def raw(self, field, t0=None):
+        """(times, values) of every retained sample of `field` from `t0` on."""
+        i = 0 if t0 is None else bisect_left(self._times, t0)
+        col = self._cols[self.fields.index(field)]
+        return self._times[i:].tolist(), col[i:].tolist()
+
+    def window(self, t0, t1, max_points):
+        """Samples between `t0` and `t1`, reduced so each series has about
+        `max_points` points whatever the span (see Window)."""
+        times = self._times
+        # One sample either side so lines run all the way to the edges.
+        i0 = max(0, bisect_left(times, t0) - 1)
+        i1 = min(len(times), bisect_right(times, t1) + 1)
+        n = i1 - i0
+        if n <= 0:
+            return Window(0, [], {f: [] for f in self.fields}, {f: [] for f in self.fields})
+
+        k = 0
+        while (n >> k) > max(1, max_points) and k < len(self._levels):
+            k += 1
+        if k == 0:
+            values = {f: col[i0:i1].tolist() for f, col in zip(self.fields, self._cols)}
+            return Window(0, times[i0:i1].tolist(), values, values)
+
+        off, lmins, lmaxs = self._levels[k - 1]
+        g0, g1 = self._start + i0, self._start + i1
+        b0 = max(g0 >> k, off)
+        b1 = min(g1 >> k, off + len(lmins[0]))  # exclusive; complete blocks only
+        start, size = self._start, 1 << k
+        out_t = [times[max(b * size - start, 0)] for b in range(b0, b1)]
+        mins = {f: m[b0 - off:b1 - off].tolist() for f, m in zip(self.fields, lmins)}
+        maxs = {f: m[b0 - off:b1 - off].tolist() for f, m in zip(self.fields, lmaxs)}
+
+        # The newest samples don't fill a whole block yet; fold them into one
+        # extra envelope point straight from the raw arrays.
+        tail = max(b1 * size - start, i0)
+        if tail < i1:
+            out_t.append(times[tail])
+            for f, col in zip(self.fields, self._cols):
+                part = col[tail:i1]
+                mins[f].append(min(part))
+                maxs[f].append(max(part))
+        return Window(k, out_t, mins, maxs)
+
+    def _complete_block(self, k, j):
+        if k == 1:
+            i = 2 * j - self._start
+            if i < 0:
+                return
+            mins = [min(c[i], c[i + 1]) for c in self._cols]
+            maxs = [max(c[i], c[i + 1]) for c in self._cols]
+        else:
+            if len(self._levels) < k - 1:
+                return
+            off, cmins, cmaxs = self._levels[k - 2]
+            i = 2 * j - off
+            if i < 0 or i + 1 >= len(cmins[0]):
+                return
+            mins = [min(m[i], m[i + 1]) for m in cmins]
+            maxs = [max(m[i], m[i + 1]) for m in cmaxs]
+
+        while len(self._levels) < k:
+            self._levels.append(
+                [None, [array("d") for _ in self.fields], [array("d") for _ in self.fields]]
+            )
+        lvl = self._levels[k - 1]
+        if lvl[0] is None or lvl[0] + len(lvl[1][0]) != j:
+            # Blocks must stay contiguous; start the level over if one was skipped.
+            lvl[0] = j
+            for a in lvl[1] + lvl[2]:
+                del a[:]
+        for a, v in zip(lvl[1], mins):
+            a.append(v)
+        for a, v in zip(lvl[2], maxs):
+            a.append(v)
+
+    def _trim(self, now):
+        times = self._times
+        cut = bisect_left(times, now - self.retention)
+        # Trim in chunks so the front-of-array memmove is amortised.
+        if cut < max(64, len(times) >> 3):
+            return
+        del times[:cut]
+        for col in self._cols:
+            del col[:cut]
+        self._start += cut
+        for k, lvl in enumerate(self._levels, start=1):
+            if lvl[0] is None:
+                continue
+            drop = min((self._start >> k) - lvl[0], len(lvl[1][0]))
+            if drop > 0:
+                for a in lvl[1] + lvl[2]:
+                    del a[:drop]
+                lvl[0] += drop
@@ -0,0 +1,375 @@
+# history_log.py — Append-only, day-segmented long-term history on disk.
+#
+# Layout (next to config.json):
+#   history/2026-10-19.seg   records, one per second
+#   history/2026-10-19.idx   JSON index: time range, count, per-field min/max
+#
+# A record is a tag byte followed by zigzag varints for the time (ms) and each
+# field (scaled to integers). KEY records hold absolute values and start every
+# writer session; DELTA records hold differences from the previous record.
+# A torn final record (crash mid-write) is ignored by readers and cut off when
+# the writer next opens that segment, so new records never follow a partial one.
+
+import json
+import os
+import time
+from array import array
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from sampling import FIELDS
+
+KEY = 0
+DELTA = 1
+
+SEGMENT_SUFFIX = ".seg"
+INDEX_SUFFIX = ".idx"
+
+# Integer scale per field: bytes/s are whole numbers already; packet, error
+# and drop rates keep two decimals.
+_SCALES = {"rx": 1, "tx": 1}
+_DEFAULT_SCALE = 100
+
+_READ_CHUNK = 1 << 16
+
+
+def _day(t):
+    # Segments roll over at UTC midnight so DST changes never split or merge days.
+    return datetime.fromtimestamp(t, timezone.utc).strftime("%Y-%m-%d")
+
+
+def _day_start(day):
+    return datetime.strptime(day, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp()
+
+
+def _put_varint(out, v):
+    v = (v << 1) ^ (v >> 63)  # zigzag: small negatives stay short
+    while v >= 0x80:
+        out.append((v & 0x7F) | 0x80)
+        v >>= 7
+    out.append(v)
+
+
+def _decode(chunks, nfields):
+    """Yield integer rows (t_ms, v0, v1, ...) from a stream of byte chunks."""
+    prev = [0] * (nfields + 1)
+    row = []
+    tag = None
+    v = shift = 0
+    for chunk in chunks:
+        for byte in chunk:
+            if tag is None:
+                tag = byte
+                continue
+            v |= (byte & 0x7F) << shift
+            if byte & 0x80:
+                shift += 7
+                continue
+            row.append((v >> 1) ^ -(v & 1))
+            v = shift = 0
+            if len(row) == nfields + 1:
+                if tag == DELTA:
+                    row = [p + d for p, d in zip(prev, row)]
+                prev = row
+                yield row
+                row = []
+                tag = None
+
+
+def _complete_length(chunks, nfields):
+    """Byte length of the leading complete records in a stream of chunks."""
+    end = pos = 0
+    left = None  # varints still to come in the current record; None = at a tag
+    for chunk in chunks:
+        for byte in chunk:
+            pos += 1
+            if left is None:
+                left = nfields + 1
+            elif not byte & 0x80:
+                left -= 1
+                if not left:
+                    end = pos
+                    left = None
+    return end
+
+
+def _read_chunks(path):
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(_READ_CHUNK)
+            if not chunk:
+                return
+            yield chunk
+
+
+def read_segment(path, fields, t0=None, t1=None):
+    """(times, columns) of one segment's records within [t0, t1], as arrays.
+
+    Needs nothing from a HistoryLog, so it can run in a worker process (see
+    qt_history_loader.py); the arrays pickle back as flat buffers.
+    """
+    scales = [_SCALES.get(f, _DEFAULT_SCALE) for f in fields]
+    lo = None if t0 is None else t0 * 1000.0
+    hi = None if t1 is None else t1 * 1000.0
+    times = array("d")
+    cols = [array("d") for _ in fields]
+    for row in _decode(_read_chunks(path), len(fields)):
+        if lo is not None and row[0] < lo:
+            continue
+        if hi is not None and row[0] > hi:
+            break
+        times.append(row[0] / 1000.0)
+        for col, v, s in zip(cols, row[1:], scales):
+            col.append(v / s)
+    return times, cols
+
+
+class _SegmentIndex:
+    __slots__ = ("t_min", "t_max", "count", "mins", "maxs", "size")
+
+    def __init__(self, nfields):
+        self.t_min = self.t_max = None
+        self.count = 0
+        self.size = 0  # segment bytes covered; anything past it wasn't indexed
+        self.mins = [None] * nfields
+        self.maxs = [None] * nfields
+
+    def add(self, t, values):
+        if self.t_min is None or t < self.t_min:
+            self.t_min = t
+        if self.t_max is None or t > self.t_max:
+            self.t_max = t
+        self.count += 1
+        for i, v in enumerate(values):
+            if self.mins[i] is None or v < self.mins[i]:
+                self.mins[i] = v
+            if self.maxs[i] is None or v > self.maxs[i]:
+                self.maxs[i] = v
+
+    def to_json(self, fields):
+        return {
+            "t_min": self.t_min,
+            "t_max": self.t_max,
+            "count": self.count,
+            "size": self.size,
+            "min": dict(zip(fields, self.mins)),
+            "max": dict(zip(fields, self.maxs)),
+        }
+
+    @classmethod
+    def from_json(cls, d, fields):
+        idx = cls(len(fields))
+        idx.t_min, idx.t_max, idx.count = d["t_min"], d["t_max"], d["count"]
+        idx.size = d.get("size")
+        idx.mins = [d["min"].get(f) for f in fields]
+        idx.maxs = [d["max"].get(f) for f in fields]
+        return idx
+
+
+class HistoryLog:
+    """Writes one averaged record per `resolution` seconds and answers range
+    queries by opening only the day segments that overlap them."""
+
+    def __init__(self, directory, fields=FIELDS, retention_days=90, resolution=1.0,
+                 flush_every=5.0):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.fields = tuple(fields)
+        self.retention_days = retention_days
+        self.resolution = float(resolution)
+        self.flush_every = flush_every
+        self._scales = [_SCALES.get(f, _DEFAULT_SCALE) for f in self.fields]
+
+        self._day = None
+        self._file = None
+        self._index = None
+        self._prev = None  # last written integer row; None = next record is a KEY
+        self._buf = bytearray()
+        self._last_flush = time.monotonic()
+
+        # Samples arriving faster than `resolution` are averaged, weighted by
+        # how long each one covered.
+        self._bucket = None
+        self._acc = [0.0] * len(self.fields)
+        self._acc_time = 0.0
+
+        self.prune()
+
+    # ── Writing ──
+
+    def append(self, t, values, elapsed=None):
+        bucket = int(t // self.resolution)
+        if self._bucket is not None and bucket != self._bucket:
+            self._emit()
+        self._bucket = bucket
+        weight = elapsed if elapsed and elapsed > 0 else 1.0
+        for i, v in enumerate(values):
+            self._acc[i] += v * weight
+        self._acc_time += weight
+        if time.monotonic() - self._last_flush >= self.flush_every:
+            self.flush()
+
+    def _emit(self):
+        if not self._acc_time:
+            return
+        t = (self._bucket + 1) * self.resolution
+        values = [a / self._acc_time for a in self._acc]
+        self._acc = [0.0] * len(self.fields)
+        self._acc_time = 0.0
+        self._write(t, values)
+
+    def _write(self, t, values):
+        day = _day(t)
+        if day != self._day:
+            self._open(day)
+        row = [round(t * 1000)] + [round(v * s) for v, s in zip(values, self._scales)]
+        if self._prev is None:
+            self._buf.append(KEY)
+            for v in row:
+                _put_varint(self._buf, v)
+        else:
+            self._buf.append(DELTA)
+            for v, p in zip(row, self._prev):
+                _put_varint(self._buf, v - p)
+        self._prev = row
+        self._index.add(t, values)
+
+    def _open(self, day):
+        self._close_segment()
+        self._day = day
+        seg = self.directory / (day + SEGMENT_SUFFIX)
+        size = seg.stat().st_size if seg.exists() else 0
+        self._index = self._load_index(day) if size else None
+        if self._index is None or self._index.size != size:
+            # Index missing or stale, or the segment ends in a torn record
+            # (e.g. after a crash): rebuild the index and cut the file back to
+            # its last complete record, or the next append would be decoded
+            # as the rest of the torn one.
+            self._index = _SegmentIndex(len(self.fields))
+            if size:
+                for t, values in self._decode_segment(seg):
+                    self._index.add(t, values)
+                end = _complete_length(_read_chunks(seg), len(self.fields))
+                if end < size:
+                    os.truncate(seg, end)
+                self._index.size = end
+        self._file = open(seg, "ab")
+        self._prev = None  # each writer session starts with a KEY record
+        self.prune()
+
+    def flush(self):
+        if self._file is not None and self._buf:
+            self._file.write(self._buf)
+            self._file.flush()
+            self._buf.clear()
+            self._index.size = self._file.tell()
+            self._write_index()
+        self._last_flush = time.monotonic()
+
+    def _write_index(self):
+        path = self.directory / (self._day + INDEX_SUFFIX)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self._index.to_json(self.fields), f)
+        os.replace(tmp, path)
+
+    def _close_segment(self):
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        self._emit()
+        self._close_segment()
+
+    # ── Reading ──
+
+    def _load_index(self, day):
+        path = self.directory / (day + INDEX_SUFFIX)
+        seg = self.directory / (day + SEGMENT_SUFFIX)
+        try:
+            # An index older than its segment missed some appends.
+            if path.stat().st_mtime < seg.stat().st_mtime - 1:
+                return None
+            with open(path) as f:
+                return _SegmentIndex.from_json(json.load(f), self.fields)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def days(self):
+        return sorted(p.stem for p in self.directory.glob("*" + SEGMENT_SUFFIX))
+
+    def segment_path(self, day):
+        return self.directory / (day + SEGMENT_SUFFIX)
+
+    def days_between(self, t0, t1):
+        """Days whose segment could hold records in [t0, t1], oldest first.
+        Decided from the file names alone, so it costs no reads."""
+        return [d for d in self.days() if _day_start(d) <= t1 and _day_start(d) + 86400 >= t0]
+
+    def segments(self, t0=None, t1=None):
+        """(day, index) for every segment overlapping [t0, t1], oldest first.
+
+        Index entries carry the time range and per-field min/max, so coarse
+        questions can be answered without decoding any samples.
+        """
+        out = []
+        for day in self.days():
+            start = _day_start(day)
+            if (t1 is not None and start > t1) or (t0 is not None and start + 86400 < t0):
+                continue
+            if day == self._day:
+                idx = self._index
+            else:
+                idx = self._load_index(day)
+                if idx is None:
+                    idx = _SegmentIndex(len(self.fields))
+                    for t, values in self._decode_segment(self.directory / (day + SEGMENT_SUFFIX)):
+                        idx.add(t, values)
+            if idx.count == 0:
+                continue
+            if (t1 is not None and idx.t_min > t1) or (t0 is not None and idx.t_max < t0):
+                continue
+            out.append((day, idx))
+        return out
+
+    def _decode_segment(self, path):
+        scales = self._scales
+        for row in _decode(_read_chunks(path), len(self.fields)):
+            yield row[0] / 1000.0, [v / s for v, s in zip(row[1:], scales)]
+
+    def query(self, t0=None, t1=None, flush=True):
+        """Stream (time, values) for every record in [t0, t1], oldest first.
+
+        Only overlapping segments are opened and they are decoded in chunks,
+        so memory use doesn't grow with the range. A reader on another thread
+        passes flush=False (the writer isn't thread-safe) and sees what was
+        on disk at the writer's last flush.
+        """
+        if flush and self._file is not None:
+            self.flush()
+        for day, _ in self.segments(t0, t1):
+            for t, values in self._decode_segment(self.directory / (day + SEGMENT_SUFFIX)):
+                if t0 is not None and t < t0:
+                    continue
+                if t1 is not None and t > t1:
+                    break
+                yield t, values
+
+    # ── Retention ──
+
+    def prune(self, now=None):
+        """Delete segments older than retention_days (0 keeps everything)."""
+        if not self.retention_days:
+            return
+        now = time.time() if now is None else now
+        oldest = (datetime.fromtimestamp(now, timezone.utc)
+                  - timedelta(days=self.retention_days)).strftime("%Y-%m-%d")
+        for day in self.days():
+            if day < oldest and day != self._day:
+                for suffix in (SEGMENT_SUFFIX, INDEX_SUFFIX):
+                    try:
+                        (self.directory / (day + suffix)).unlink()
+                    except FileNotFoundError:
+                        pass
@@ -0,0 +1,134 @@
+# latency.py — TCP connect round-trip probes to host:port targets, on asyncio.
+#
+# A probe is a plain TCP handshake (connect, then close), so it needs no raw
+# sockets or root. The time measured is the connect alone; names are
+# resolved once up front and again only after a failure.
+
+import asyncio
+import ipaddress
+import socket
+import time
+from typing import NamedTuple
+
+from sampling import Schedule
+
+DEFAULT_PORT = 443
+
+
+class Target(NamedTuple):
+    host: str
+    port: int
+
+
+class ProbeResult(NamedTuple):
+    time: float  # wall-clock time the probe finished
+    target: str  # as configured, so results map straight back to settings
+    rtt: float  # seconds; None when the probe failed
+    error: str = ""
+
+
+def parse_target(text):
+    """'host:port', '[v6addr]:port', or a bare host or IPv6 address (port 443) -> Target."""
+    text = text.strip()
+    if text.startswith("["):
+        host, sep, rest = text[1:].partition("]")
+        if not sep or (rest and not rest.startswith(":")):
+            raise ValueError(f"bad target: {text!r}")
+        port = rest[1:]
+    elif text.count(":") == 1:
+        host, port = text.split(":")
+    elif ":" in text:
+        # Only an IPv6 address may go unbracketed (and then has no port).
+        try:
+            ipaddress.IPv6Address(text)
+        except ValueError:
+            raise ValueError(f"bad target: {text!r}") from None
+        host, port = text, ""
+    else:
+        host, port = text, ""
+    if not host:
+        raise ValueError(f"bad target: {text!r}")
+    port = int(port) if port else DEFAULT_PORT
+    if not 0 < port < 65536:
+        raise ValueError(f"bad port in {text!r}")
+    return Target(host, port)
+
+
+async def _resolve(target):
+    loop = asyncio.get_running_loop()
+    infos = await loop.getaddrinfo(target.host, target.port, type=socket.SOCK_STREAM)
+    family, _, _, _, addr = infos[0]
+    return family, addr
+
+
+async def connect_rtt(family, addr, timeout):
+    """Seconds for one TCP handshake with `addr`; raises OSError/TimeoutError."""
+    loop = asyncio.get_running_loop()
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setblocking(False)
+    try:
+        start = time.perf_counter()
+        await asyncio.wait_for(loop.sock_connect(sock, addr), timeout)
+        return time.perf_counter() - start
+    finally:
+        sock.close()
+
+
+class Prober:
+    """Probes every target once per `interval`, each on its own drift-free grid.
+
+    Grids are offset by interval/N so N targets are spread evenly across the
+    interval instead of all connecting at once; `concurrency` further caps
+    how many handshakes can be in flight together.
+    """
+
+    def __init__(self, targets, interval=5.0, timeout=2.0, concurrency=32):
+        self.targets = tuple(targets)
+        self.interval = float(interval)
+        self.timeout = float(timeout)
+        self.concurrency = concurrency
+
+    async def run(self, report):
+        """Probe until cancelled, calling `report(ProbeResult)` for each probe."""
+        if not self.targets:
+            return
+        limit = asyncio.Semaphore(self.concurrency)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        step = self.interval / len(self.targets)
+        tasks = [
+            asyncio.ensure_future(self._probe_target(text, start + i * step, limit, report))
+            for i, text in enumerate(self.targets)
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _probe_target(self, text, start, limit, report):
+        loop = asyncio.get_running_loop()
+        try:
+            target = parse_target(text)
+        except ValueError as e:
+            report(ProbeResult(time.time(), text, None, str(e)))
+            return
+        schedule = Schedule(self.interval, start)
+        deadline = start
+        address = None
+        while True:
+            await asyncio.sleep(max(0.0, deadline - loop.time()))
+            async with limit:
+                try:
+                    if address is None:
+                        address = await asyncio.wait_for(_resolve(target), self.timeout)
+                    rtt = await connect_rtt(*address, self.timeout)
+                    result = ProbeResult(time.time(), text, rtt)
+                except asyncio.TimeoutError:
+                    result = ProbeResult(time.time(), text, None, "timed out")
+                except OSError as e:
+                    address = None  # re-resolve next time in case the name moved
+                    result = ProbeResult(time.time(), text, None, e.strerror or str(e))
+            report(result)
+            deadline = schedule.next_deadline(loop.time())
@@ -1,16 +1,27 @@
 # main.py — Entry point. Creates the overlay widget, system tray icon, and update loop.
 
+import argparse
+import multiprocessing
 import sys
-import time
 from pathlib import Path
 
-import psutil
 from PyQt5 import QtCore, QtGui, QtWidgets
-from PyQt5.QtCore import Qt, QRectF
+from PyQt5.QtCore import Qt
 
 from config import Config
 from graph_window import GraphWindow
+from history import History
+from history_log import HistoryLog
+from overlay import InterfaceOverlay, Overlay, label_font_family
+from qt_baseline import Baselines
+from qt_history_loader import HistoryLoader
+from qt_latency import LatencyProber
+from qt_sampler import QtSampler
+from sampling import FIELDS
 from settings_dialog import SettingsDialog
+from shared_samples import SamplePublisher
+from talkers_window import TopTalkersWindow, stop_workers
+import single_instance
 
 
 def _asset_path(relative: str) -> str:
@@ -20,25 +31,16 @@ def _asset_path(relative: str) -> str:
     return str(base / relative)
 
 
-class TinyNetUseWidget(QtWidgets.QWidget):
-    def __init__(self):
-        super().__init__()
+class TinyNetUseWidget(Overlay):
+    """The main overlay. Owns the sampler, history, tray icon, graph and the
+    extra overlays, which all share its one counter read per tick."""
 
+    def __init__(self, config=None, source=None):
         # ── Load Config & State ──
-        self.config = Config()
-        self.locked = False
-
-        # ── Window Setup ──
-        d = self.config.data
-        self.setAttribute(Qt.WA_TranslucentBackground)
-        self.resize(140, 60)
-        base_flags = Qt.FramelessWindowHint | Qt.Tool
-        self.setWindowFlags(
-            base_flags
-            | (Qt.WindowStaysOnTopHint if d.get("widget_always_on_top") else 0)
-        )
-        self.setWindowOpacity(d.get("opacity", 1.0))
-        self.always_on_top = d.get("widget_always_on_top", True)
+        # `source` replaces psutil.net_io_counters (e.g. sampling.SyntheticCounters).
+        config = config or Config()
+        d = config.data
+        super().__init__(config, always_on_top=bool(d.get("widget_always_on_top", True)))
 
         # ── App Icon ──
         app_icon = QtGui.QIcon()
@@ -50,33 +52,42 @@ class TinyNetUseWidget(QtWidgets.QWidget):
         self.setWindowIcon(app_icon)
         QtWidgets.QApplication.setWindowIcon(app_icon)
 
-        # ── Font ──
-        font_name = d.get("font", "Segoe UI")
-        font = QtGui.QFont(font_name, d.get("font_size", 10))
-        if not font.exactMatch():
-            # Font isn't available - fall back for rendering but don't overwrite
-            # the user's saved preference; they might just need to install the font.
-            font = QtGui.QFont("Segoe UI", d.get("font_size", 10))
-        QtWidgets.QApplication.setFont(font)
-
-        # ── Labels ──
-        layout = QtWidgets.QVBoxLayout(self)
-        layout.setContentsMargins(8, 8, 8, 8)
-        layout.setSpacing(2)
-        self.dl_label = QtWidgets.QLabel()
-        self.ul_label = QtWidgets.QLabel()
-        for lbl in (self.dl_label, self.ul_label):
-            # Dynamic initial color
-            lbl.setStyleSheet(f"color: {d.get('font_color', 'white')}")
-            layout.addWidget(lbl)
-
-        # ── Psutil Counters ──
-        cnt = psutil.net_io_counters()
-        self._last_sent, self._last_recv = cnt.bytes_sent, cnt.bytes_recv
-
-        # ── Update Timer ──
-        self.timer = QtCore.QTimer(self)
-        self.timer.timeout.connect(self._update_speeds)
+        # ── Sampler ──
+        # One counter read per tick, shared by the overlay and the graph.
+        self.sampler = QtSampler(
+            self.config.settings.update_interval, source, self, self.config.settings.interfaces
+        )
+        self.sampler.sampled.connect(self._on_sample)
+
+        # ── History ──
+        # Filled on every tick whether or not the graph exists (an O(1)
+        # append), so reopening the graph shows full history straight away.
+        self.history = History(FIELDS, retention=self.config.settings.history_retention)
+
+        # ── Long-term History Log ──
+        # Opened by apply_settings when history_log is on.
+        self.history_log = None
+        QtWidgets.QApplication.instance().aboutToQuit.connect(self._close_history_log)
+
+        # ── Baselines ──
+        # Yesterday / last week and the hour-of-week envelope for the graph,
+        # read from the log. Nothing is loaded until the graph asks for it.
+        self.baselines = Baselines(None, self.config.settings.history_retention, self)
+        self.sampler.sampled.connect(self.baselines.add)
+        QtWidgets.QApplication.instance().aboutToQuit.connect(self.baselines.stop)
+
+        # ── Latency Probes ──
+        # TCP connect RTTs to latency_targets, probed off the GUI thread and
+        # kept per target next to the throughput history. Started by
+        # apply_settings; idle when no targets are configured.
+        self.latency = LatencyProber(self)
+        QtWidgets.QApplication.instance().aboutToQuit.connect(self.latency.stop)
+
+        # ── Shared Memory ──
+        # Live samples and a short ring of recent ones for other local
+        # processes (see shared_reader.py). Opened by apply_settings.
+        self.publisher = None
+        QtWidgets.QApplication.instance().aboutToQuit.connect(self._close_publisher)
 
         geom = d.get("widget_geometry")
         if isinstance(geom, (list, tuple)) and len(geom) == 4:
@@ -88,25 +99,38 @@ class TinyNetUseWidget(QtWidgets.QWidget):
         # ── Locked? ──
         self.locked = bool(d.get("widget_locked", False))
 
-        # ── Drag support ──
-        self._drag_offset = None
-
-        # ── Resizing support ──
-        self._resizing = False
-        self._resize_start_pos = None
-        self._resize_start_geom = None
+        # ── Extra Overlays ──
+        # One InterfaceOverlay per `overlays` entry, each on its own
+        # QtSampler channel; built and reconciled by apply_settings.
+        self.overlays = []
 
         # ── Graph Window ──
 
+        # Created when shown and destroyed when closed, so a hidden graph
+        # costs no memory or CPU beyond the shared history.
         self.graph_window = None
+        # Top Talkers panel, created when opened and deleted when closed. Its
+        # worker threads can outlive it, so they are waited for at quit.
+        self.talkers_window = None
+        QtWidgets.QApplication.instance().aboutToQuit.connect(stop_workers)
         self.graph_visible = d.get("graph_visible", False)
         if self.graph_visible:
-            self.graph_window = GraphWindow(parent=self, config=self.config)
-            self.graph_window.closed.connect(self._on_graph_closed)
-            self.graph_window.show()
+            self._create_graph().show()
 
         # ── Apply current settings ──
         self.apply_settings()
+        self.config.subscribe(self.apply_settings)
+
+        # ── History Backfill ──
+        # The history is filled from the log after the first paint, on worker
+        # processes, newest day first; live samples show from the first tick.
+        self.history_loader = None
+        if self.history_log is not None:
+            self.history_loader = HistoryLoader(self.history, self.history_log, self)
+            self.history_loader.progress.connect(self._on_history_backfilled)
+            self.history_loader.finished.connect(self._on_history_backfilled)
+            QtWidgets.QApplication.instance().aboutToQuit.connect(self.history_loader.stop)
+            QtCore.QTimer.singleShot(0, self.history_loader.start)
 
         # ── System Tray ──
         self._setup_tray()
@@ -136,6 +160,12 @@ class TinyNetUseWidget(QtWidgets.QWidget):
         graph.triggered.connect(self.toggle_graph)
         menu.addAction(graph)
 
+        talkers = QtWidgets.QAction("Top Talkers", self)
+        talkers.triggered.connect(self.open_talkers)
+        menu.addAction(talkers)
+
+        menu.addAction("New Overlay…", self.add_overlay)
+
         menu.addSeparator()
         menu.addAction("Quit", QtWidgets.QApplication.quit)
 
@@ -147,9 +177,8 @@ class TinyNetUseWidget(QtWidgets.QWidget):
         self.config.save()
 
         if visible:
-            if self.graph_window is None or not self.graph_window.isVisible():
-                self.graph_window = GraphWindow(parent=self, config=self.config)
-                self.graph_window.closed.connect(self._on_graph_closed)
+            if self.graph_window is None:
+                self._create_graph()
             self.graph_window.show()
             self.graph_window.raise_()
             self.graph_window.activateWindow()
@@ -157,6 +186,19 @@ class TinyNetUseWidget(QtWidgets.QWidget):
             if self.graph_window:
                 self.graph_window.close()
 
+    def _create_graph(self):
+        self.graph_window = GraphWindow(
+            parent=self,
+            config=self.config,
+            sampler=self.sampler,
+            history=self.history,
+            latency=self.latency,
+            baselines=self.baselines,
+        )
+        self.graph_window.setAttribute(Qt.WA_DeleteOnClose)
+        self.graph_window.closed.connect(self._on_graph_closed)
+        return self.graph_window
+
     def toggle_always_on_top(self, on: bool):
         self.always_on_top = on
         f = self.windowFlags() & ~Qt.WindowStaysOnTopHint
@@ -174,172 +216,167 @@ class TinyNetUseWidget(QtWidgets.QWidget):
         self.config.data["widget_locked"] = lock
         self.config.save()
 
-    def open_settings(self):
-        dlg = SettingsDialog(self)
-        if dlg.exec_() == QtWidgets.QDialog.Accepted:
-            self.apply_settings()
-
-    def apply_settings(self):
-        d = self.config.data
+    def open_talkers(self):
+        # Created on demand and destroyed on close, so its worker thread only
+        # runs while the panel is open.
+        if self.talkers_window is None:
+            self.talkers_window = TopTalkersWindow(parent=self, config=self.config)
+            self.talkers_window.setAttribute(Qt.WA_DeleteOnClose)
+            self.talkers_window.closed.connect(self._on_talkers_closed)
+        self.talkers_window.show()
+        self.talkers_window.raise_()
+        self.talkers_window.activateWindow()
 
-        # Alert color
-        self.alert_color = d.get("alert_color", "#FF5555")
-        self._alert_active = False
+    def _on_talkers_closed(self):
+        self.talkers_window = None
 
-        # Interval
-        self.timer.setInterval(int(d["update_interval"] * 1000))
-        self.timer.start()
+    def open_settings(self):
+        # Accepting the dialog commits the config, which calls apply_settings
+        # with just the fields that changed.
+        SettingsDialog(self).exec_()
 
-        # Formatting
-        self.unit = d["unit"]
-        self.precision = d["precision"]
-        self.threshold = d["notify_threshold"].get("download")
-        self.opacity = d["opacity"]
+    def apply_settings(self, changed=None):
+        # `changed` holds the Settings field names from Config.commit();
+        # None (first run) applies everything.
+        s = self.config.settings
+        every = changed is None
 
-        # Font settings
-        self.font = d.get("font", "Segoe UI")
-        self.font_size = d.get("font_size", 10)
-        self.font_color = d.get("font_color", "white")
-        self.font_bold = d.get("font_bold", True)
+        if every or "update_interval" in changed:
+            self.sampler.set_interval(s.update_interval)
+            self.sampler.start()
 
-        # Update labels' color
-        for lbl in (self.dl_label, self.ul_label):
-            lbl.setStyleSheet(f"color: {self.font_color}")
+        if not every and "interfaces" in changed:
+            self.sampler.set_interfaces(s.interfaces)
 
         # Font family + size go app-wide so dialogs use the right typeface.
-        # Bold is widget-only — applying it globally would bold every menu and dialog.
-        QtWidgets.QApplication.setFont(QtGui.QFont(self.font, self.font_size))
-        label_font = QtGui.QFont(self.font, self.font_size)
-        label_font.setBold(self.font_bold)
-        for lbl in (self.dl_label, self.ul_label):
-            lbl.setFont(label_font)
-
-        # Opacity
-        self.setWindowOpacity(d.get("opacity", 1.0))
-
-        # Update graph window settings
-        if self.graph_window:
-            self.graph_window.apply_settings()
-        # Immediately refresh
-        self._update_speeds()
-
-    def _dock_bottom_right(self):
-        ag = QtWidgets.QApplication.primaryScreen().availableGeometry()
-        w, h = self.width(), self.height()
-        x = ag.right() - w - 10
-        y = ag.bottom() - h - 10
-        self.setGeometry(x, y, w, h)
-
-    def _update_speeds(self):
-        now = time.time()
-        elapsed = now - getattr(self, "_last_time", now)
-        self._last_time = now
-
-        if elapsed == 0:
-            return
+        # setFont re-lays out every widget in the app, so only do it when needed.
+        if every or changed & {"font", "font_size"}:
+            family = label_font_family(s.font, s.font_size)
+            QtWidgets.QApplication.setFont(QtGui.QFont(family, s.font_size))
+
+        if every or "history_retention" in changed:
+            self.history.retention = s.history_retention
+            if not every:
+                self.baselines.set_retention(s.history_retention)
+
+        if every or changed & {"history_log", "history_log_days"}:
+            self._apply_history_log(s)
+
+        if every or "shared_memory" in changed:
+            if s.shared_memory and self.publisher is None:
+                self._open_publisher()
+            elif not s.shared_memory:
+                self._close_publisher()
+
+        if every or changed & {
+            "latency_targets",
+            "latency_interval",
+            "latency_timeout",
+            "history_retention",
+        }:
+            self.latency.configure(
+                s.latency_targets, s.latency_interval, s.latency_timeout, s.history_retention
+            )
 
-        cnt = psutil.net_io_counters()
-        raw_sent = cnt.bytes_sent - self._last_sent
-        raw_recv = cnt.bytes_recv - self._last_recv
-        self._last_sent, self._last_recv = cnt.bytes_sent, cnt.bytes_recv
-
-        sent_per_sec = raw_sent / elapsed
-        recv_per_sec = raw_recv / elapsed
-
-        def fmt(raw, mb):
-            u = self.unit
-            if u == "B/s":
-                return f"{raw:.{self.precision}f} B/s"
-            if u == "KB/s":
-                return f"{raw / 1024:.{self.precision}f} KB/s"
-            if u == "MB/s":
-                return f"{mb:.{self.precision}f} MB/s"
-            if u == "b/s":
-                return f"{raw * 8:.{self.precision}f} b/s"
-            if u == "Kib/s":
-                return f"{raw * 8 / 1024:.{self.precision}f} Kib/s"
-            if u == "Mib/s":
-                return f"{raw * 8 / (1 << 20):.{self.precision}f} Mib/s"
-            # auto
-            if mb >= 1:
-                return f"{mb:.{self.precision}f} MB/s"
-            return f"{raw / 1024:.{self.precision}f} KB/s"
-
-        mb_recv = recv_per_sec / (1 << 20)
-        mb_sent = sent_per_sec / (1 << 20)
-
-        self.dl_label.setText("↓ " + fmt(recv_per_sec, mb_recv))
-        self.ul_label.setText("↑ " + fmt(sent_per_sec, mb_sent))
-
-        self._alert_active = False
-        if self.threshold and mb_recv > self.threshold:
-            self._alert_active = True
-
-        self.update()  # for trigger repaint
-
-    def paintEvent(self, event):
-        path = QtGui.QPainterPath()
-        path.addRoundedRect(QRectF(self.rect()), 8.0, 8.0)
-        p = QtGui.QPainter(self)
-        p.setRenderHint(QtGui.QPainter.Antialiasing)
-
-        # Change background color based on alert state
-        if getattr(self, "_alert_active", False):
-            bg_color = QtGui.QColor(self.alert_color)
-        else:
-            bg_color = QtGui.QColor(0, 0, 0, 160)
-        p.fillPath(path, bg_color)
-
-        # For Drag Handle
-        p.setPen(QtGui.QPen(QtGui.QColor("#aaa")))
-        size = 16
-        for i in range(4, size, 4):
-            p.drawLine(self.width() - i, self.height(), self.width(), self.height() - i)
-
-    def mousePressEvent(self, e):
-        if e.button() == Qt.LeftButton and not self.locked:
-            grip = 16
-            pos = e.pos()
-            if pos.x() > self.width() - grip and pos.y() > self.height() - grip:
-                # Capture the start geometry once so the delta stays stable during drag.
-                self._resizing = True
-                self._resize_start_pos = e.globalPos()
-                self._resize_start_geom = self.geometry()
-            else:
-                self._drag_offset = e.globalPos() - self.frameGeometry().topLeft()
+        if every or "overlays" in changed:
+            self._apply_overlays(s.overlays)
 
-    def mouseMoveEvent(self, e):
-        grip_size = 16
-        in_grip_area = (
-            self.width() - grip_size < e.x() < self.width()
-            and self.height() - grip_size < e.y() < self.height()
-        )
+        self.apply_style(changed)
+        for ov in self.overlays:
+            ov.apply_style(changed)
 
-        if self._resizing:
-            dx = e.globalX() - self._resize_start_pos.x()
-            dy = e.globalY() - self._resize_start_pos.y()
-            new_w = max(self.minimumWidth(), self._resize_start_geom.width() + dx)
-            new_h = max(self.minimumHeight(), self._resize_start_geom.height() + dy)
-            self.resize(new_w, new_h)
-        elif in_grip_area:
-            self.setCursor(Qt.SizeFDiagCursor)
-        elif not self.locked and self._drag_offset and (e.buttons() & Qt.LeftButton):
-            self.move(e.globalPos() - self._drag_offset)
-            self.setCursor(Qt.ClosedHandCursor)
+    def _apply_overlays(self, specs):
+        # Entries are matched by position; an edited entry is applied in place.
+        for i, spec in enumerate(specs):
+            if i < len(self.overlays):
+                self.overlays[i].set_spec(spec)
+            else:
+                ov = InterfaceOverlay(
+                    self.config, i, spec, self.sampler.channel(spec.interfaces), self
+                )
+                ov.remove_requested.connect(self.remove_overlay)
+                ov.show()
+                self.overlays.append(ov)
+        for ov in self.overlays[len(specs):]:
+            self._drop_overlay(ov)
+        del self.overlays[len(specs):]
+
+    def _drop_overlay(self, ov):
+        ov.detach()
+        self.sampler.remove_channel(ov.channel)
+        ov.close()
+        ov.deleteLater()
+
+    def add_overlay(self):
+        name, ok = QtWidgets.QInputDialog.getText(self, "New Overlay", "Name (e.g. WAN, VPN):")
+        if not ok:
+            return
+        text, ok = QtWidgets.QInputDialog.getText(
+            self, "New Overlay", "Interfaces (e.g. eth*, wlan0, !veth*):"
+        )
+        if not ok:
+            return
+        interfaces = [t.strip() for t in text.split(",") if t.strip()]
+        self.config.data["overlays"].append({"name": name.strip(), "interfaces": interfaces})
+        self.config.commit()
+
+    def remove_overlay(self, ov):
+        # Removed here rather than by reconciling, so the overlays after it
+        # keep their own windows and just shift down one index.
+        i = self.overlays.index(ov)
+        del self.overlays[i]
+        self._drop_overlay(ov)
+        for later in self.overlays[i:]:
+            later.index -= 1
+        del self.config.data["overlays"][i]
+        self.config.commit()
+
+    def _apply_history_log(self, s):
+        if not s.history_log:
+            self._close_history_log()
+        elif self.history_log is None:
+            self.history_log = HistoryLog(
+                self.config.path.parent / "history", retention_days=s.history_log_days
+            )
+            self.sampler.sampled.connect(self._log_sample)
+            self.baselines.set_log(self.history_log)
         else:
-            self.setCursor(Qt.ArrowCursor)
-
-    def mouseReleaseEvent(self, e):
-
-        # release the resizing flag and reset cursor
-        self._resizing = False
-        self.setCursor(QtCore.Qt.ArrowCursor)
-        self._resize_start_pos = None
-        self._resize_start_geom = None
-
-        if not self.locked:
-            self._drag_offset = None
-        g = self.geometry()
+            self.history_log.retention_days = s.history_log_days
+            self.history_log.prune()
+
+    def _log_sample(self, sample):
+        self.history_log.append(sample.time, sample.rates(), sample.elapsed)
+
+    def _on_history_backfilled(self):
+        if self.graph_window is not None:
+            self.graph_window.history_backfilled(done=not self.history_loader.running)
+
+    def _close_history_log(self):
+        if self.history_log is not None:
+            self.sampler.sampled.disconnect(self._log_sample)
+            self.baselines.set_log(None)
+            self.history_log.close()
+            self.history_log = None
+
+    def _open_publisher(self):
+        try:
+            self.publisher = SamplePublisher(FIELDS)
+        except OSError:
+            return  # e.g. no /dev/shm in a sandbox; nothing else depends on it
+        self.sampler.sampled.connect(self.publisher.publish_sample)
+
+    def _close_publisher(self):
+        if self.publisher is not None:
+            self.sampler.sampled.disconnect(self.publisher.publish_sample)
+            self.publisher.close()
+            self.publisher = None
+
+    def _on_sample(self, sample):
+        # One counter read gives bytes, packets, errors and drops together.
+        self.history.append(sample.time, sample.rates())
+        super()._on_sample(sample)
+
+    def _save_geometry(self, g):
         self.config.data["widget_geometry"] = [g.x(), g.y(), g.width(), g.height()]
         self.config.save()
 
@@ -379,6 +416,9 @@ class TinyNetUseWidget(QtWidgets.QWidget):
         graph.setChecked(self.graph_visible)
         graph.triggered.connect(self.toggle_graph)
 
+        self._tray_menu.addAction("Top Talkers", self.open_talkers)
+        self._tray_menu.addAction("New Overlay…", self.add_overlay)
+
         self._tray_menu.addSeparator()
         self._tray_menu.addAction("Quit", QtWidgets.QApplication.quit)
 
@@ -390,19 +430,77 @@ class TinyNetUseWidget(QtWidgets.QWidget):
             self.activateWindow()
 
     def closeEvent(self, e):
-        self.timer.stop()
+        if self.talkers_window is not None:
+            self.talkers_window.close()
+        self.sampler.stop()
+        self.latency.stop()
+        if self.history_loader is not None:
+            self.history_loader.stop()
+        self._close_history_log()
+        self.baselines.stop()
+        self._close_publisher()
         if hasattr(self, "tray"):
             self.tray.hide()
         QtWidgets.qApp.quit()
 
     def _on_graph_closed(self):
+        self.graph_window = None  # WA_DeleteOnClose frees the window itself
         self.graph_visible = False
         self.config.data["graph_visible"] = False
         self.config.save()
 
+    def handle_command(self, command):
+        # Commands come from a second launch (see single_instance.py).
+        if command == "show":
+            self.show()
+            self.raise_()
+            self.activateWindow()
+        elif command == "graph":
+            self.toggle_graph(not self.graph_visible)
+        elif command == "settings":
+            # Deferred so the modal loop doesn't run inside the socket's readyRead.
+            QtCore.QTimer.singleShot(0, self.open_settings)
+        elif command == "quit":
+            QtWidgets.QApplication.quit()
+
+
+def _parse_command(argv):
+    parser = argparse.ArgumentParser(prog="TinyNetUse", add_help=False)
+    group = parser.add_mutually_exclusive_group()
+    for cmd in single_instance.COMMANDS:
+        group.add_argument(
+            f"--{cmd}", dest="command", action="store_const", const=cmd
+        )
+    # parse_known_args leaves Qt's own flags (-platform, -style, ...) alone.
+    args, _ = parser.parse_known_args(argv)
+    return args.command or "show"
+
+
+def main():
+    command = _parse_command(sys.argv[1:])
+
+    # Hand off to a running instance before any app, window or icon setup.
+    if single_instance.send_to_running(command):
+        return 0
+    if command == "quit":
+        return 0
 
-if __name__ == "__main__":
     app = QtWidgets.QApplication(sys.argv)
+    server = single_instance.InstanceServer()
+    if not server.listen() and single_instance.send_to_running(command):
+        # Lost a start-up race to another instance; it has our command now.
+        return 0
+
     w = TinyNetUseWidget()
+    server.command_received.connect(w.handle_command)
     w.show()
-    sys.exit(app.exec_())
+    if command != "show":
+        w.handle_command(command)
+    return app.exec_()
+
+
+if __name__ == "__main__":
+    # History is decoded in spawned worker processes (qt_history_loader.py);
+    # in a frozen build those start by re-running this executable.
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,296 @@
+# overlay.py — The floating speed readout. TinyNetUseWidget (main.py) is the main one;
+# any number of InterfaceOverlays show other interface groups from the same sampler.
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+from PyQt5.QtCore import Qt, QRectF
+
+import units
+
+
+def label_font_family(family, size):
+    # Font isn't available - fall back for rendering but don't overwrite
+    # the user's saved preference; they might just need to install the font.
+    return family if QtGui.QFont(family, size).exactMatch() else "Segoe UI"
+
+
+class Overlay(QtWidgets.QWidget):
+    """Frameless, translucent readout of one sample stream.
+
+    Subclasses connect a `sampled` signal to _on_sample, say where geometry
+    is saved (_save_geometry) and may override setting() to change individual
+    settings for their own overlay.
+    """
+
+    def __init__(self, config, parent=None, title=None, always_on_top=True):
+        super().__init__(parent)
+        self.config = config
+        self.locked = False
+
+        # ── Window Setup ──
+        self.setAttribute(Qt.WA_TranslucentBackground)
+        self.resize(140, 60)
+        base_flags = Qt.FramelessWindowHint | Qt.Tool
+        self.setWindowFlags(base_flags | (Qt.WindowStaysOnTopHint if always_on_top else 0))
+        self.always_on_top = always_on_top
+
+        # ── Labels ──
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.setContentsMargins(8, 8, 8, 8)
+        layout.setSpacing(2)
+        # Which interface group this is; only extra overlays have one.
+        self.title_label = QtWidgets.QLabel(title) if title else None
+        self.dl_label = QtWidgets.QLabel()
+        self.ul_label = QtWidgets.QLabel()
+        # Packets/s, average packet size and drops; hidden unless show_packet_stats.
+        self.pkt_label = QtWidgets.QLabel()
+        self.labels = tuple(
+            lbl
+            for lbl in (self.title_label, self.dl_label, self.ul_label, self.pkt_label)
+            if lbl is not None
+        )
+        for lbl in self.labels:
+            layout.addWidget(lbl)
+
+        self._sample = None
+        self._alert_active = False
+        # Last text set on each label; setText and repaints are skipped when
+        # a tick renders exactly what is already shown.
+        self._shown = {}
+
+        # ── Drag support ──
+        self._drag_offset = None
+
+        # ── Resizing support ──
+        self._resizing = False
+        self._resize_start_pos = None
+        self._resize_start_geom = None
+
+    def setting(self, name):
+        """The setting `name` as this overlay should use it."""
+        return getattr(self.config.settings, name)
+
+    def apply_style(self, changed=None):
+        # Same contract as apply_settings: None applies everything.
+        every = changed is None
+
+        if every or changed & {"unit", "precision"}:
+            self._fmt = units.formatter(self.setting("unit"), self.setting("precision"))
+
+        if every or "font_color" in changed:
+            for lbl in self.labels:
+                lbl.setStyleSheet(f"color: {self.setting('font_color')}")
+
+        # Bold is widget-only — applying it globally would bold every menu and dialog.
+        if every or changed & {"font", "font_size", "font_bold"}:
+            size = self.setting("font_size")
+            label_font = QtGui.QFont(label_font_family(self.setting("font"), size), size)
+            label_font.setBold(self.setting("font_bold"))
+            for lbl in self.labels:
+                lbl.setFont(label_font)
+
+        if every or "opacity" in changed:
+            self.setWindowOpacity(self.setting("opacity"))
+
+        if every or "show_packet_stats" in changed:
+            self.pkt_label.setVisible(self.setting("show_packet_stats"))
+
+        # Re-render the last rates instead of taking a fresh reading: a sample
+        # over a few milliseconds would just show noise.
+        if every or changed & {
+            "unit",
+            "precision",
+            "notify_download",
+            "alert_color",
+            "show_packet_stats",
+        }:
+            self._render_speeds(force=True)
+
+    def _dock_bottom_right(self, offset=0):
+        ag = QtWidgets.QApplication.primaryScreen().availableGeometry()
+        w, h = self.width(), self.height()
+        x = ag.right() - w - 10
+        y = ag.bottom() - h - 10 - offset
+        self.setGeometry(x, y, w, h)
+
+    def _on_sample(self, sample):
+        self._sample = sample
+        self._render_speeds()
+
+    def _render_speeds(self, force=False):
+        sample = self._sample
+        recv_per_sec = sample.rx if sample else 0.0
+        text = self._fmt.text
+
+        self._set_label(self.dl_label, "↓ " + text(recv_per_sec))
+        self._set_label(self.ul_label, "↑ " + text(sample.tx if sample else 0.0))
+        if self.setting("show_packet_stats") and sample:
+            pkt = (
+                f"⇅ {sample.rx_pkts:.0f}/{sample.tx_pkts:.0f} pkt/s · "
+                f"{sample.avg_rx_packet:.0f} B"
+            )
+            if sample.drops or sample.errors:
+                pkt += f" · ⚠ {sample.drops:.0f} drop {sample.errors:.0f} err/s"
+            self._set_label(self.pkt_label, pkt)
+
+        threshold = self.setting("notify_download")
+        alert = bool(threshold and recv_per_sec / (1 << 20) > threshold)
+        # Labels repaint themselves on setText; the background only needs a
+        # repaint when the alert state (or its colour) changes.
+        if force or alert != self._alert_active:
+            self._alert_active = alert
+            self.update()
+
+    def _set_label(self, label, text):
+        if self._shown.get(label) != text:
+            self._shown[label] = text
+            label.setText(text)
+
+    def paintEvent(self, event):
+        path = QtGui.QPainterPath()
+        path.addRoundedRect(QRectF(self.rect()), 8.0, 8.0)
+        p = QtGui.QPainter(self)
+        p.setRenderHint(QtGui.QPainter.Antialiasing)
+
+        # Change background color based on alert state
+        if self._alert_active:
+            bg_color = QtGui.QColor(self.setting("alert_color"))
+        else:
+            bg_color = QtGui.QColor(0, 0, 0, 160)
+        p.fillPath(path, bg_color)
+
+        # For Drag Handle
+        p.setPen(QtGui.QPen(QtGui.QColor("#aaa")))
+        size = 16
+        for i in range(4, size, 4):
+            p.drawLine(self.width() - i, self.height(), self.width(), self.height() - i)
+
+    def mousePressEvent(self, e):
+        if e.button() == Qt.LeftButton and not self.locked:
+            grip = 16
+            pos = e.pos()
+            if pos.x() > self.width() - grip and pos.y() > self.height() - grip:
+                # Capture the start geometry once so the delta stays stable during drag.
+                self._resizing = True
+                self._resize_start_pos = e.globalPos()
+                self._resize_start_geom = self.geometry()
+            else:
+                self._drag_offset = e.globalPos() - self.frameGeometry().topLeft()
+
+    def mouseMoveEvent(self, e):
+        grip_size = 16
+        in_grip_area = (
+            self.width() - grip_size < e.x() < self.width()
+            and self.height() - grip_size < e.y() < self.height()
+        )
+
+        if self._resizing:
+            dx = e.globalX() - self._resize_start_pos.x()
+            dy = e.globalY() - self._resize_start_pos.y()
+            new_w = max(self.minimumWidth(), self._resize_start_geom.width() + dx)
+            new_h = max(self.minimumHeight(), self._resize_start_geom.height() + dy)
+            self.resize(new_w, new_h)
+        elif in_grip_area:
+            self.setCursor(Qt.SizeFDiagCursor)
+        elif not self.locked and self._drag_offset and (e.buttons() & Qt.LeftButton):
+            self.move(e.globalPos() - self._drag_offset)
+            self.setCursor(Qt.ClosedHandCursor)
+        else:
+            self.setCursor(Qt.ArrowCursor)
+
+    def mouseReleaseEvent(self, e):
+
+        # release the resizing flag and reset cursor
+        self._resizing = False
+        self.setCursor(QtCore.Qt.ArrowCursor)
+        self._resize_start_pos = None
+        self._resize_start_geom = None
+
+        if not self.locked:
+            self._drag_offset = None
+        self._save_geometry(self.geometry())
+
+    def _save_geometry(self, g):
+        pass  # subclasses that remember where they were moved persist `g` here
+
+
+class InterfaceOverlay(Overlay):
+    """An extra overlay for one entry of the `overlays` setting.
+
+    Fed by a QtSampler channel, so it adds no counter reads of its own. Its
+    entry may override font_color, font_size and opacity; everything else
+    follows the main overlay.
+    """
+
+    remove_requested = QtCore.pyqtSignal(object)  # self
+
+    def __init__(self, config, index, spec, channel, parent=None):
+        super().__init__(config, parent, title=spec.name)
+        self.index = index
+        self.spec = spec
+        self.channel = channel
+        entry = self._entry()
+        self.locked = bool(entry.get("locked", False))
+
+        geom = entry.get("geometry")
+        if isinstance(geom, (list, tuple)) and len(geom) == 4:
+            x, y, w, h = map(int, geom)
+            self.setGeometry(x, y, w, h)
+        else:
+            # Stack new overlays above the main one.
+            self._dock_bottom_right(offset=(index + 1) * (self.height() + 6))
+
+        self.apply_style()
+        channel.sampled.connect(self._on_sample)
+
+    def _entry(self):
+        return self.config.data["overlays"][self.index]
+
+    def setting(self, name):
+        value = getattr(self.spec, name, None)
+        return getattr(self.config.settings, name) if value is None else value
+
+    def set_spec(self, spec):
+        """Apply an edited entry in place (the channel and window are kept)."""
+        if spec == self.spec:
+            return
+        old, self.spec = self.spec, spec
+        if spec.interfaces != old.interfaces:
+            self.channel.set_interfaces(spec.interfaces)
+        if spec.name != old.name:
+            self.title_label.setText(spec.name)
+        changed = {f for f in ("font_color", "font_size", "opacity")
+                   if getattr(spec, f) != getattr(old, f)}
+        if changed:
+            self.apply_style(changed)
+
+    def _save_geometry(self, g):
+        self._entry()["geometry"] = [g.x(), g.y(), g.width(), g.height()]
+        self.config.save()
+
+    def contextMenuEvent(self, event):
+        menu = QtWidgets.QMenu(self)
+        lock = QtWidgets.QAction("Lock Position", self, checkable=True)
+        lock.setChecked(self.locked)
+        lock.triggered.connect(self.toggle_lock)
+        menu.addAction(lock)
+        menu.addAction("Interfaces…", self._edit_interfaces)
+        menu.addSeparator()
+        menu.addAction("Remove Overlay", lambda: self.remove_requested.emit(self))
+        menu.exec_(event.globalPos())
+
+    def toggle_lock(self, lock: bool):
+        self.locked = lock
+        self._entry()["locked"] = lock
+        self.config.save()
+
+    def _edit_interfaces(self):
+        text, ok = QtWidgets.QInputDialog.getText(
+            self, self.spec.name, "Interfaces (e.g. eth*, wlan0, !veth*):",
+            text=", ".join(self.spec.interfaces),
+        )
+        if ok:
+            self._entry()["interfaces"] = [t.strip() for t in text.split(",") if t.strip()]
+            self.config.commit()  # the main overlay applies it via set_spec
+
+    def detach(self):
+        self.channel.sampled.disconnect(self._on_sample)
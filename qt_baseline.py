@@ -0,0 +1,239 @@
+# qt_baseline.py — Loads baselines (baseline.py) from the HistoryLog in worker processes
+# and keeps them current for the graph.
+
+import time
+from array import array
+from bisect import bisect_right
+
+from PyQt5 import QtCore
+
+import baseline
+from baseline import ENVELOPE_WEEKS, SHIFTS, WEEK, Envelope
+from history import History
+from qt_history_loader import process_pool
+
+# Baseline series kept for the graph: download and upload, like the live lines.
+BASELINE_FIELDS = ("rx", "tx")
+
+# The shifted window is loaded this far past "now - shift" and topped up a
+# chunk at a time as the clock catches up, so a load happens about once per
+# LOOKAHEAD rather than on every tick or paint.
+LOOKAHEAD = 3600.0
+
+
+class _Load:
+    """One job's per-day segment decodes, running on their own executor."""
+
+    __slots__ = ("job", "days", "executor", "results")
+
+    def __init__(self, job, days):
+        self.job = job
+        self.days = days  # oldest first
+        self.executor = None
+        self.results = {}  # day -> decoded part, or None if it couldn't be read
+
+
+class Baselines(QtCore.QObject):
+    """The selected compare-with window and the hour-of-week envelope.
+
+    Both are built once from the log, each day segment decoded in a worker
+    process like qt_history_loader.py does, and then kept up to date
+    incrementally: live samples feed the envelope, and the shifted window
+    is topped up from the log a LOOKAHEAD chunk at a time. Painting
+    only ever reads `shifted` (a History, so the graph takes a reduced
+    window of it like the live series) and the cached envelope bands.
+    """
+
+    changed = QtCore.pyqtSignal()
+    _decoded = QtCore.pyqtSignal(object)  # (load, day, future), from an executor thread
+
+    def __init__(self, log, retention, parent=None):
+        super().__init__(parent)
+        self.mode = None  # None or a key of baseline.SHIFTS
+        self.show_envelope = False
+        self.retention = retention
+        self.shifted = History(BASELINE_FIELDS, retention + 2 * LOOKAHEAD)
+        self.envelope = None  # Envelope once its first build finished
+        self._env_pending = None  # live-fed Envelope while the first build runs
+        self._env_since = None  # live samples after this go straight in
+        self._loaded_until = None  # source time the shifted window is loaded to
+        self._loading_shift = False
+        self._generation = 0  # bumped on a mode change; stale loads are dropped
+        self._bands_key = None
+        self._bands = []
+        self.log = None
+        self._loads = []  # _Load in flight
+        self._decoded.connect(self._on_decoded)
+        self.set_log(log)
+
+    def set_log(self, log):
+        """Use another log (or None: keep what's loaded, stop loading more)."""
+        if log is self.log:
+            return
+        self.stop()
+        self.log = log
+        if log is None:
+            return
+        # Anything that was mid-load from the old log is asked for again.
+        self._loading_shift = False
+        if self.mode:
+            self._reload_shifted(time.time())
+        if self.show_envelope and self.envelope is None:
+            self._env_pending = None
+            self._load_envelope(time.time())
+
+    def stop(self):
+        """Drop every load in flight. Never waits: a segment already being
+        decoded finishes in its worker process and is discarded."""
+        for load in self._loads:
+            if load.executor is not None:
+                load.executor.shutdown(wait=False, cancel_futures=True)
+        self._loads = []
+
+    def configure(self, mode, show_envelope):
+        now = time.time()
+        if mode not in SHIFTS:
+            mode = None
+        if mode != self.mode:
+            self.mode = mode
+            self._reload_shifted(now)
+        self.show_envelope = bool(show_envelope)
+        if self.show_envelope and self.envelope is None and self._env_pending is None:
+            self._load_envelope(now)
+        self.changed.emit()
+
+    def set_retention(self, retention):
+        self.retention = retention
+        self.shifted.retention = retention + 2 * LOOKAHEAD
+        if self.mode:
+            self._reload_shifted(time.time())
+
+    def add(self, sample):
+        """Live sample from the overlay's sampler."""
+        env = self.envelope if self.envelope is not None else self._env_pending
+        if env is not None and sample.time > self._env_since:
+            env.add(sample.time, sample.rx, sample.elapsed)
+            self._bands_key = None
+        if (
+            self.mode
+            and not self._loading_shift
+            and self._loaded_until is not None
+            and sample.time - SHIFTS[self.mode] + LOOKAHEAD / 2 > self._loaded_until
+        ):
+            self._load_shifted(self._loaded_until, self._loaded_until + LOOKAHEAD)
+
+    def bands(self, t0, t1):
+        """Envelope bands for [t0, t1] (see Envelope.bands); recomputed only
+        when the view crosses an hour boundary or new data arrived."""
+        if self.envelope is None:
+            return []
+        key = (t0 // 3600, t1 // 3600)
+        if key != self._bands_key:
+            self._bands = self.envelope.bands(key[0] * 3600, (key[1] + 1) * 3600)
+            self._bands_key = key
+        return self._bands
+
+    # ── Loading ──
+
+    def _queue(self, job):
+        if self.log is None:
+            return False
+        kind, t0, t1 = job[:3]
+        # Everything up to now must be on disk for the workers to read it.
+        self.log.flush()
+        load = _Load(job, self.log.days_between(t0, t1))
+        self._loads.append(load)
+        if not load.days:
+            QtCore.QTimer.singleShot(0, lambda: self._finish(load))
+            return True
+        fields = self.log.fields
+        load.executor = process_pool(len(load.days))
+        for day in load.days:
+            path = self.log.segment_path(day)
+            if kind == "envelope":
+                fut = load.executor.submit(
+                    baseline.segment_envelope, path, fields, t0, t1,
+                    BASELINE_FIELDS[0], self.log.resolution,
+                )
+            else:
+                fut = load.executor.submit(
+                    baseline.segment_shifted, path, fields, t0, t1, job[3], BASELINE_FIELDS
+                )
+            fut.add_done_callback(lambda f, day=day: self._decoded.emit((load, day, f)))
+        return True
+
+    def _on_decoded(self, item):
+        load, day, fut = item
+        if load not in self._loads:
+            return  # stopped meanwhile
+        try:
+            load.results[day] = fut.result()
+        except Exception:
+            # A segment we can't read (pruned at midnight, truncated, a worker
+            # that died) just leaves a gap.
+            load.results[day] = None
+        if len(load.results) == len(load.days):
+            self._finish(load)
+
+    def _finish(self, load):
+        if load not in self._loads:
+            return
+        self._loads.remove(load)
+        if load.executor is not None:
+            load.executor.shutdown(wait=False)
+        parts = [load.results[d] for d in load.days if load.results[d] is not None]
+        if load.job[0] == "envelope":
+            result = Envelope()
+            for env in parts:
+                result.merge(env)
+        else:
+            times = array("d")
+            cols = [array("d") for _ in BASELINE_FIELDS]
+            for part_times, part_cols in parts:
+                times.extend(part_times)
+                for col, part in zip(cols, part_cols):
+                    col.extend(part)
+            result = (times, cols)
+        self._on_loaded(load.job, result)
+
+    def _reload_shifted(self, now):
+        self._generation += 1
+        self.shifted = History(BASELINE_FIELDS, self.retention + 2 * LOOKAHEAD)
+        self._loaded_until = None
+        self._loading_shift = False
+        self._bands_key = None
+        if self.mode:
+            shift = SHIFTS[self.mode]
+            self._load_shifted(now - shift - self.retention, now - shift + LOOKAHEAD)
+
+    def _load_shifted(self, t0, t1):
+        job = ("shifted", t0, t1, SHIFTS[self.mode], self._generation)
+        self._loading_shift = self._queue(job)
+
+    def _load_envelope(self, now):
+        # Live samples are collected meanwhile and merged when the build lands.
+        self._env_since = now
+        self._env_pending = Envelope()
+        self._queue(("envelope", now - ENVELOPE_WEEKS * WEEK, now))
+
+    def _on_loaded(self, job, result):
+        if job[0] == "envelope":
+            if job[2] != self._env_since or self._env_pending is None:
+                return  # superseded by a later build (the log was swapped)
+            result.merge(self._env_pending)
+            self.envelope, self._env_pending = result, None
+            self._bands_key = None
+        else:
+            if job[4] != self._generation:
+                return  # for a mode that has since been switched away from
+            self._loading_shift = False
+            times, cols = result
+            last = self.shifted.last_time
+            if last is None:
+                # The first load is the whole window: one bulk insert.
+                self.shifted.prepend(times, cols)
+            else:
+                for i in range(bisect_right(times, last), len(times)):
+                    self.shifted.append(times[i], [col[i] for col in cols])
+            self._loaded_until = job[2]
+        self.changed.emit()
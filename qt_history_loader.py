@@ -0,0 +1,114 @@
+# qt_history_loader.py — Backfills the in-memory History from the HistoryLog at startup,
+# without holding up the first paint.
+#
+# Each day segment is decoded in a worker process (the decoder is pure Python,
+# so threads would just take turns on the GIL, and the GUI thread with them).
+# Days are submitted newest first and merged into the History newest first,
+# each one put in front of what is already there, so the graph fills in from
+# the right while live samples keep arriving. A merge runs on the GUI thread
+# and moves the days merged before it (see History.prepend), so later merges
+# take longer.
+
+import multiprocessing
+import os
+import time
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from PyQt5 import QtCore
+
+from history_log import read_segment
+
+
+def process_pool(jobs, workers=None):
+    """An executor for `jobs` decodes: spawned processes where possible."""
+    workers = min(workers or os.cpu_count() or 1, jobs)
+    try:
+        # spawn, not fork: forking a process that already runs Qt and other
+        # threads isn't safe, and spawn is what Windows does anyway.
+        return ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+    except (OSError, NotImplementedError):
+        # No working multiprocessing (e.g. no sem_open in a sandbox).
+        return ThreadPoolExecutor(workers)
+
+
+class HistoryLoader(QtCore.QObject):
+    """Fills `history` with logged records from the last history.retention
+    seconds that are older than its first live sample."""
+
+    progress = QtCore.pyqtSignal()  # another day was merged into the history
+    finished = QtCore.pyqtSignal()
+    _decoded = QtCore.pyqtSignal(object)  # (day, future), from an executor thread
+
+    def __init__(self, history, log, parent=None, workers=None):
+        super().__init__(parent)
+        self.history = history
+        self.log = log
+        self.workers = workers
+        self.loaded = 0  # records merged so far
+        self._executor = None
+        self._order = []  # days still to merge, newest first
+        self._ready = {}  # day -> decoded (times, columns), waiting for newer days
+        self._decoded.connect(self._on_decoded)
+
+    @property
+    def running(self):
+        return self._executor is not None
+
+    def start(self, now=None):
+        now = time.time() if now is None else now
+        t0 = now - self.history.retention
+        t1 = self.history.first_time or now
+        self.log.flush()
+        self._order = self.log.days_between(t0, t1)[::-1]
+        if not self._order:
+            self.finished.emit()
+            return
+        self._executor = process_pool(len(self._order), self.workers)
+        for day in self._order:
+            fut = self._executor.submit(
+                read_segment, self.log.segment_path(day), self.log.fields, t0, t1
+            )
+            fut.add_done_callback(lambda f, day=day: self._decoded.emit((day, f)))
+
+    def stop(self):
+        # Cleared first: cancelling runs the done callbacks, which must find
+        # nothing left to merge.
+        self._order = []
+        self._ready.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _on_decoded(self, item):
+        day, fut = item
+        if day not in self._order:
+            return  # stopped meanwhile
+        try:
+            self._ready[day] = fut.result()
+        except Exception:
+            # A segment we can't read (deleted by pruning, truncated, a worker
+            # that died) just leaves a gap; the rest still loads.
+            self._ready[day] = None
+        merged = False
+        while self._order and self._order[0] in self._ready:
+            self._merge(self._ready.pop(self._order.pop(0)))
+            merged = True
+        if merged:
+            self.progress.emit()
+        if not self._order:
+            self.stop()
+            self.finished.emit()
+
+    def _merge(self, decoded):
+        if decoded is None:
+            return
+        times, cols = decoded
+        # Only what's older than the history already holds (the log also has
+        # this session's records, which the History got live).
+        first = self.history.first_time
+        n = len(times) if first is None else bisect_left(times, first)
+        if n:
+            by_field = dict(zip(self.log.fields, cols))
+            self.history.prepend(times[:n], [by_field[f][:n] for f in self.history.fields])
+            self.loaded += n
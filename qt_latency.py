@@ -0,0 +1,101 @@
+# qt_latency.py — Runs latency.Prober on its own thread and asyncio loop, and keeps a
+# History of round-trip times per target for the graph.
+
+import asyncio
+
+from PyQt5 import QtCore
+
+from history import History
+from latency import Prober
+
+# Per-target history fields. A failed probe records the timeout as its RTT
+# (the handshake took at least that long) and lost = 1.
+RTT_FIELDS = ("rtt", "lost")
+
+
+class _ProbeWorker(QtCore.QObject):
+    """Lives on its own QThread, which the asyncio loop occupies until stop()."""
+
+    probed = QtCore.pyqtSignal(object)  # latency.ProbeResult
+
+    def __init__(self, prober):
+        super().__init__()
+        self.prober = prober
+        # Created here but only ever run on the worker thread; stop() reaches
+        # it through call_soon_threadsafe, so it can be called before run().
+        self._loop = asyncio.new_event_loop()
+
+    @QtCore.pyqtSlot()
+    def run(self):
+        try:
+            self._loop.run_until_complete(self.prober.run(self.probed.emit))
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._loop.close()
+
+    def stop(self):
+        """Cancel every probe; safe to call from any thread."""
+        def cancel():
+            for task in asyncio.all_tasks(self._loop):
+                task.cancel()
+
+        if not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(cancel)
+
+
+class LatencyProber(QtCore.QObject):
+    """Probes the configured targets and appends each result to its History.
+
+    Results cross back to the GUI thread as queued signals, so the histories
+    are only ever touched here, like the throughput history in the overlay.
+    """
+
+    probed = QtCore.pyqtSignal(object)  # latency.ProbeResult, already in history
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.histories = {}  # target text -> History(RTT_FIELDS)
+        self.last = {}  # target text -> latest ProbeResult
+        self.timeout = 2.0
+        self._thread = None
+        self._worker = None
+
+    def configure(self, targets, interval, timeout, retention):
+        """(Re)start probing `targets`; history is kept for targets that stay."""
+        self.stop()
+        self.timeout = timeout
+        self.histories = {
+            t: self.histories.get(t) or History(RTT_FIELDS, retention) for t in targets
+        }
+        for h in self.histories.values():
+            h.retention = retention
+        self.last = {t: r for t, r in self.last.items() if t in self.histories}
+        if not targets:
+            return
+        self._worker = _ProbeWorker(Prober(targets, interval, timeout))
+        self._thread = QtCore.QThread(self)
+        self._worker.moveToThread(self._thread)
+        self._thread.started.connect(self._worker.run)
+        self._thread.finished.connect(self._worker.deleteLater)
+        self._worker.probed.connect(self._on_result)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._worker.stop()
+            self._thread.quit()
+            self._thread.wait()
+            self._thread = self._worker = None
+
+    def _on_result(self, result):
+        history = self.histories.get(result.target)
+        if history is None:
+            return  # queued before a reconfigure dropped this target
+        lost = result.rtt is None
+        rtt = self.timeout if lost else result.rtt
+        # Wall-clock time can step backwards; keep the history ordered.
+        t = max(result.time, history.last_time or 0.0)
+        history.append(t, (rtt, float(lost)))
+        self.last[result.target] = result
+        self.probed.emit(result)
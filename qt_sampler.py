@@ -0,0 +1,106 @@
+# qt_sampler.py — Qt-side consumer of the sampling package: one counter read per tick,
+# broadcast to every widget that wants it.
+
+import time
+
+from PyQt5 import QtCore
+from PyQt5.QtCore import Qt
+
+from sampling import InterfaceTracker, RateMeter, Schedule
+
+
+class SampleChannel(QtCore.QObject):
+    """Samples for another interface selection, taken from the same counter
+    read as the QtSampler that owns it (see QtSampler.channel)."""
+
+    sampled = QtCore.pyqtSignal(object)  # sampling.Sample
+
+    def __init__(self, tracker, parent):
+        super().__init__(parent)
+        self.tracker = tracker
+        self.meter = RateMeter(tracker)
+        self.last = None
+
+    def set_interfaces(self, patterns):
+        self.tracker.select(patterns)
+
+    def _take(self, now):
+        sample = self.meter.sample(now)
+        if sample is not None:
+            self.last = sample
+            self.sampled.emit(sample)
+
+
+class QtSampler(QtCore.QObject):
+    sampled = QtCore.pyqtSignal(object)  # sampling.Sample
+
+    def __init__(self, interval, source=None, parent=None, interfaces=()):
+        super().__init__(parent)
+        # Sums the selected NICs and keeps totals steady as links come and go;
+        # the set is only re-matched on link add/remove events.
+        self.tracker = InterfaceTracker(source, interfaces)
+        self.meter = RateMeter(self.tracker)
+        self.last = None
+        self._channels = []
+        self._schedule = Schedule(interval, time.monotonic())
+        # Single-shot timer re-armed for each grid deadline, so ticks don't
+        # drift the way a repeating QTimer's do.
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self.tick)
+
+    @property
+    def interval(self):
+        return self._schedule.interval
+
+    def set_interval(self, interval):
+        self._schedule.reset(interval, time.monotonic())
+        if self._timer.isActive():
+            self._arm()
+
+    def set_interfaces(self, patterns):
+        self.tracker.select(patterns)
+
+    def channel(self, patterns):
+        """A SampleChannel for `patterns`, fed from this sampler's reads."""
+        ch = SampleChannel(self.tracker.follower(patterns), self)
+        self._channels.append(ch)
+        return ch
+
+    def remove_channel(self, ch):
+        if ch in self._channels:
+            self._channels.remove(ch)
+            ch.deleteLater()
+
+    def start(self):
+        if not self._timer.isActive():
+            self._schedule.reset(self._schedule.interval, time.monotonic())
+            self._arm()
+
+    def stop(self):
+        self._timer.stop()
+
+    def isActive(self):
+        return self._timer.isActive()
+
+    def tick(self):
+        self.sample_now()
+        self._arm()
+
+    def sample_now(self):
+        """Read the counters once and broadcast the sample, outside the schedule."""
+        sample = self.meter.sample()
+        if sample is not None:
+            self.last = sample
+            self.sampled.emit(sample)
+            # Channels reuse the counters just read, so the OS is polled once
+            # per tick however many there are.
+            for ch in self._channels:
+                ch._take(sample.time)
+        return sample
+
+    def _arm(self):
+        now = time.monotonic()
+        delay = self._schedule.next_deadline(now) - now
+        self._timer.start(max(0, int(delay * 1000)))
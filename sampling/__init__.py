@@ -0,0 +1,26 @@
+# sampling/__init__.py — Network rate sampling, usable without the GUI.
+#
+#   from sampling import stream
+#   async for sample in stream(interval=1.0):
+#       print(sample.rx, sample.tx)
+
+from .interfaces import InterfaceTracker, NetlinkWatcher, RescanWatcher
+from .rates import FIELDS, RateMeter, Sample
+from .schedule import Schedule
+from .stream import iter_batches, iter_samples, stream, stream_batches
+from .synthetic import SyntheticCounters
+
+__all__ = [
+    "FIELDS",
+    "InterfaceTracker",
+    "NetlinkWatcher",
+    "RateMeter",
+    "RescanWatcher",
+    "Sample",
+    "Schedule",
+    "SyntheticCounters",
+    "iter_batches",
+    "iter_samples",
+    "stream",
+    "stream_batches",
+]
@@ -0,0 +1,259 @@
+# sampling/interfaces.py — Per-interface counters that survive links coming and going.
+#
+# InterfaceTracker reads per-NIC counters and adds up the deltas of the
+# selected interfaces into running totals, so RateMeter sees counters that
+# never go backwards however much the interface set churns. Which interfaces
+# exist is learned from link events (rtnetlink on Linux, a periodic rescan
+# elsewhere), so patterns are only re-matched when a link is added or removed.
+
+import socket
+import struct
+import sys
+import time
+from fnmatch import fnmatchcase
+
+import psutil
+
+from .synthetic import snetio
+
+# linux/rtnetlink.h, linux/netlink.h, linux/if_link.h
+_RTMGRP_LINK = 1
+_RTM_NEWLINK = 16
+_RTM_DELLINK = 17
+_IFLA_IFNAME = 3
+_NLMSG = struct.Struct("=IHHII")  # len, type, flags, seq, pid
+_IFINFO = struct.Struct("=BxHiII")  # family, type, index, flags, change
+_RTATTR = struct.Struct("=HH")  # len, type
+
+ADDED = True
+REMOVED = False
+
+
+def _align(n):
+    return (n + 3) & ~3
+
+
+class NetlinkWatcher:
+    """Linux: link add/remove events from an RTMGRP_LINK netlink socket.
+
+    poll() is one non-blocking recv when nothing happened. Links are keyed by
+    index, so a rename or a delete-and-recreate under the same name (common
+    with container veths) shows up as a removal followed by an addition.
+    """
+
+    def __init__(self):
+        self._sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+        self._sock.bind((0, _RTMGRP_LINK))
+        self._sock.setblocking(False)
+        self._names = dict(socket.if_nameindex())  # index -> name
+
+    def fileno(self):
+        return self._sock.fileno()
+
+    def poll(self):
+        """[(ADDED/REMOVED, name), ...] in order, or None if events were lost
+        (receive buffer overflow) and the caller should rescan."""
+        events = []
+        while True:
+            try:
+                data = self._sock.recv(1 << 16)
+            except BlockingIOError:
+                return events
+            except OSError:  # ENOBUFS: the kernel dropped events
+                self._names = dict(socket.if_nameindex())
+                return None
+            self._parse(data, events)
+
+    def _parse(self, data, events):
+        off = 0
+        while off + _NLMSG.size <= len(data):
+            length, kind, _, _, _ = _NLMSG.unpack_from(data, off)
+            if length < _NLMSG.size:
+                break
+            if kind in (_RTM_NEWLINK, _RTM_DELLINK):
+                body = off + _NLMSG.size
+                _, _, index, _, _ = _IFINFO.unpack_from(data, body)
+                name = self._ifname(data, body + _IFINFO.size, off + length)
+                old = self._names.get(index)
+                if kind == _RTM_DELLINK:
+                    self._names.pop(index, None)
+                    if old or name:
+                        events.append((REMOVED, old or name))
+                elif name and name != old:
+                    # New link, or a rename; NEWLINK for a known name is just
+                    # a flags/state change.
+                    if old:
+                        events.append((REMOVED, old))
+                    self._names[index] = name
+                    events.append((ADDED, name))
+            off += _align(length)
+
+    @staticmethod
+    def _ifname(data, off, end):
+        while off + _RTATTR.size <= end:
+            length, kind = _RTATTR.unpack_from(data, off)
+            if length < _RTATTR.size:
+                break
+            if kind == _IFLA_IFNAME:
+                return data[off + _RTATTR.size:off + length].split(b"\0", 1)[0].decode()
+            off += _align(length)
+        return None
+
+    def close(self):
+        self._sock.close()
+
+
+class RescanWatcher:
+    """Fallback: diffs the set of interface names every `interval` seconds.
+
+    `names` returns the current names; InterfaceTracker passes the keys of
+    the counters it just read, so a rescan costs no extra enumeration.
+    """
+
+    def __init__(self, names, interval=5.0, clock=time.monotonic):
+        self._names_fn = names
+        self.interval = interval
+        self.clock = clock
+        self._known = set(names())
+        self._next = clock() + interval
+
+    def poll(self):
+        now = self.clock()
+        if now < self._next:
+            return []
+        self._next = now + self.interval
+        current = set(self._names_fn())
+        events = [(REMOVED, n) for n in sorted(self._known - current)]
+        events += [(ADDED, n) for n in sorted(current - self._known)]
+        self._known = current
+        return events
+
+    def close(self):
+        pass
+
+
+class _Replay:
+    """Watcher for a follower: hands on the events its leader just saw."""
+
+    def __init__(self, leader):
+        self._leader = leader
+
+    def poll(self):
+        return self._leader.last_events
+
+    def close(self):
+        pass
+
+
+def matches(name, patterns):
+    """True if `name` is selected by `patterns` (fnmatch; "!pat" excludes).
+
+    No positive patterns means every interface; exclusions apply either way.
+    """
+    include = [p for p in patterns if not p.startswith("!")]
+    if include and not any(fnmatchcase(name, p) for p in include):
+        return False
+    return not any(fnmatchcase(name, p[1:]) for p in patterns if p.startswith("!"))
+
+
+class InterfaceTracker:
+    """Callable like psutil.net_io_counters(), summing only the selected NICs.
+
+    Each tick reads per-NIC counters once and adds each tracked interface's
+    delta since its own baseline to running totals. A link that appears gets
+    its baseline from its first reading (contributing nothing until the next
+    one); a link that goes away just stops contributing. Totals therefore
+    never step backwards, so RateMeter never sees a glitch.
+
+    source:    psutil.net_io_counters or a stand-in (needs pernic=True).
+    patterns:  see matches(); empty = all interfaces.
+    watcher:   object with poll() -> events (see NetlinkWatcher); default is
+               link_watcher().
+    """
+
+    def __init__(self, source=None, patterns=(), watcher=None):
+        self.source = source or psutil.net_io_counters
+        self.patterns = tuple(patterns)
+        self._cur = self.source(pernic=True, nowrap=True)
+        self.watcher = watcher or link_watcher(lambda: self._cur.keys())
+        self._known = set(self._cur)
+        self._tracked = set()
+        # Counters are handled as plain tuples in psutil's snetio field order.
+        self._base = {}  # name -> counters at the last reading
+        self._totals = [0] * len(snetio._fields)
+        self.last_events = []  # what the watcher reported on the last read
+        self._retrack()
+
+    @property
+    def tracked(self):
+        return sorted(self._tracked)
+
+    def follower(self, patterns=()):
+        """Another selection over this tracker's reads and link events.
+
+        Call it right after this tracker each tick: it reuses the counters
+        this one just read, so any number of followers cost no extra reads.
+        """
+        return InterfaceTracker(lambda pernic=True, nowrap=True: self._cur, patterns, _Replay(self))
+
+    def select(self, patterns):
+        self.patterns = tuple(patterns)
+        self._retrack()
+
+    def _retrack(self):
+        tracked = {n for n in self._known if matches(n, self.patterns)}
+        for name in self._tracked - tracked:
+            self._base.pop(name, None)
+        self._tracked = tracked
+
+    def _apply(self, events):
+        if events is None:
+            # Lost track of link events: resync from what the counters show.
+            events = [(REMOVED, n) for n in self._known - set(self._cur)]
+            events += [(ADDED, n) for n in set(self._cur) - self._known]
+        for added, name in events:
+            # Either way the old baseline is meaningless: a re-created link
+            # starts its counters from zero.
+            self._base.pop(name, None)
+            if added:
+                self._known.add(name)
+            else:
+                self._known.discard(name)
+        if events:
+            self._retrack()
+
+    def __call__(self, pernic=False, nowrap=True):
+        self._cur = cur = self.source(pernic=True, nowrap=True)
+        self.last_events = self.watcher.poll()
+        self._apply(self.last_events)
+        if pernic:
+            return {n: c for n, c in cur.items() if n in self._tracked}
+        totals, bases = self._totals, self._base
+        for name in self._tracked:
+            c = cur.get(name)
+            if c is None:
+                continue  # announced but not in the counters yet (or just gone)
+            base = bases.get(name)
+            bases[name] = c
+            if base is None:
+                continue
+            deltas = [x - b for x, b in zip(c, base)]
+            if min(deltas) < 0:
+                continue  # reset we weren't told about; re-baselined above
+            totals = [t + d for t, d in zip(totals, deltas)]
+        self._totals = totals
+        return snetio(*totals)
+
+    def close(self):
+        self.watcher.close()
+
+
+def link_watcher(names, rescan_interval=5.0):
+    """NetlinkWatcher on Linux, else (or if netlink is unavailable) a
+    RescanWatcher over `names`."""
+    if sys.platform.startswith("linux"):
+        try:
+            return NetlinkWatcher()
+        except OSError:
+            pass
+    return RescanWatcher(names, rescan_interval)
@@ -0,0 +1,87 @@
+# sampling/rates.py — Turns psutil counter readings into per-second rate samples.
+
+import time
+from typing import NamedTuple, Optional
+
+import psutil
+
+# Rate fields in the order they appear in Sample (after time/elapsed) and in
+# every History built from samples.
+FIELDS = ("rx", "tx", "rx_pkts", "tx_pkts", "errin", "errout", "dropin", "dropout")
+
+# psutil.net_io_counters() attribute behind each field, same order.
+_COUNTERS = (
+    "bytes_recv",
+    "bytes_sent",
+    "packets_recv",
+    "packets_sent",
+    "errin",
+    "errout",
+    "dropin",
+    "dropout",
+)
+
+
+class Sample(NamedTuple):
+    """Per-second rates over the `elapsed` seconds ending at `time`."""
+
+    time: float
+    elapsed: float
+    rx: float
+    tx: float
+    rx_pkts: float
+    tx_pkts: float
+    errin: float
+    errout: float
+    dropin: float
+    dropout: float
+
+    def rates(self):
+        """The rate fields only, in FIELDS order."""
+        return self[2:]
+
+    @property
+    def avg_rx_packet(self):
+        """Mean received packet size in bytes (0 when idle)."""
+        return self.rx / self.rx_pkts if self.rx_pkts else 0.0
+
+    @property
+    def avg_tx_packet(self):
+        return self.tx / self.tx_pkts if self.tx_pkts else 0.0
+
+    @property
+    def errors(self):
+        return self.errin + self.errout
+
+    @property
+    def drops(self):
+        return self.dropin + self.dropout
+
+
+class RateMeter:
+    """Reads all counters in one call per sample and diffs them against the last read."""
+
+    __slots__ = ("source", "_last", "_last_time")
+
+    def __init__(self, source=None):
+        # `source` stands in for psutil.net_io_counters (anything returning an
+        # object with the same attributes).
+        self.source = source or psutil.net_io_counters
+        self._last = self._read()
+        self._last_time = time.time()
+
+    def _read(self):
+        cnt = self.source()
+        return tuple(getattr(cnt, name) for name in _COUNTERS)
+
+    def sample(self, now=None) -> Optional[Sample]:
+        now = time.time() if now is None else now
+        elapsed = now - self._last_time
+        if elapsed <= 0:
+            return None
+        cur = self._read()
+        # Counters go backwards when a NIC resets or disappears; report zero
+        # for that tick instead of a negative rate.
+        rates = [max(c - p, 0) / elapsed for c, p in zip(cur, self._last)]
+        self._last, self._last_time = cur, now
+        return Sample(now, elapsed, *rates)
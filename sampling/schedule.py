@@ -0,0 +1,38 @@
+# sampling/schedule.py — Drift-free tick deadlines on a fixed grid.
+
+
+class Schedule:
+    """Deadlines at start + n·interval.
+
+    Each deadline is computed from the grid, not from when the previous tick
+    finished, so slow ticks never push later ones back. Slots that are already
+    past when we get to them are skipped (and counted) rather than replayed.
+    """
+
+    __slots__ = ("interval", "start", "n", "skipped")
+
+    def __init__(self, interval, start):
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        self.interval = float(interval)
+        self.start = start
+        self.n = 0
+        self.skipped = 0
+
+    def next_deadline(self, now):
+        """The first grid point after the current slot that is not already past."""
+        n = self.n + 1
+        late = int((now - self.start) / self.interval) + 1
+        if late > n:
+            self.skipped += late - n
+            n = late
+        self.n = n
+        return self.start + n * self.interval
+
+    def reset(self, interval, now):
+        """Change the interval, starting a new grid at `now`."""
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        self.interval = float(interval)
+        self.start = now
+        self.n = 0
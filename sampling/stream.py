@@ -0,0 +1,117 @@
+# sampling/stream.py — Async and sync sample streams for consumers outside the GUI.
+
+import asyncio
+import threading
+import time
+from collections import deque
+
+from .rates import RateMeter
+from .schedule import Schedule
+
+# Samples kept for a consumer that has fallen behind before the oldest are dropped.
+DEFAULT_BACKLOG = 4096
+
+
+def _take(buf, max_batch):
+    n = len(buf) if max_batch is None else min(len(buf), max_batch)
+    return [buf.popleft() for _ in range(n)]
+
+
+async def stream_batches(interval=1.0, *, max_batch=None, source=None, backlog=DEFAULT_BACKLOG):
+    """Yield lists of Samples taken every `interval` seconds.
+
+    Sampling runs in its own task on a drift-free loop.time() grid, so a slow
+    consumer doesn't slow the sampler down: everything collected since its
+    last iteration arrives as one batch (at most `max_batch` samples). If the
+    counter source raises, the samples taken before are still delivered and
+    the consumer then gets the exception.
+    """
+    loop = asyncio.get_running_loop()
+    meter = RateMeter(source)
+    buf = deque(maxlen=backlog)
+    ready = asyncio.Event()
+    failed = []  # the sampler's exception, once it has died
+
+    async def produce():
+        sched = Schedule(interval, loop.time())
+        try:
+            while True:
+                delay = sched.next_deadline(loop.time()) - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                sample = meter.sample()
+                if sample is not None:
+                    buf.append(sample)
+                    ready.set()
+        except Exception as e:
+            failed.append(e)
+            ready.set()
+
+    task = asyncio.create_task(produce())
+    try:
+        while True:
+            if not buf and not failed:
+                ready.clear()
+                await ready.wait()
+            if not buf:
+                raise failed[0]
+            yield _take(buf, max_batch)
+    finally:
+        task.cancel()
+
+
+async def stream(interval=1.0, *, source=None, backlog=DEFAULT_BACKLOG):
+    """Yield Samples one at a time: `async for sample in stream(interval=1.0)`."""
+    async for batch in stream_batches(interval, source=source, backlog=backlog):
+        for sample in batch:
+            yield sample
+
+
+def iter_batches(interval=1.0, *, max_batch=None, source=None, backlog=DEFAULT_BACKLOG):
+    """Synchronous twin of stream_batches(), sampling on a background thread.
+
+    The thread stops when the generator is closed or garbage collected. An
+    exception from the counter source is re-raised in the consumer, after
+    the samples taken before it.
+    """
+    meter = RateMeter(source)
+    buf = deque(maxlen=backlog)
+    cond = threading.Condition()
+    stop = threading.Event()
+    failed = []  # the sampler's exception, once it has died
+
+    def produce():
+        sched = Schedule(interval, time.monotonic())
+        try:
+            while not stop.is_set():
+                delay = sched.next_deadline(time.monotonic()) - time.monotonic()
+                if delay > 0 and stop.wait(delay):
+                    return
+                sample = meter.sample()
+                if sample is not None:
+                    with cond:
+                        buf.append(sample)
+                        cond.notify()
+        except Exception as e:
+            with cond:
+                failed.append(e)
+                cond.notify()
+
+    thread = threading.Thread(target=produce, name="tinynetuse-sampler", daemon=True)
+    thread.start()
+    try:
+        while True:
+            with cond:
+                cond.wait_for(lambda: buf or failed)
+                if not buf:
+                    raise failed[0]
+                batch = _take(buf, max_batch)
+            yield batch
+    finally:
+        stop.set()
+
+
+def iter_samples(interval=1.0, *, source=None, backlog=DEFAULT_BACKLOG):
+    """Synchronous twin of stream(): `for sample in iter_samples(interval=1.0)`."""
+    for batch in iter_batches(interval, source=source, backlog=backlog):
+        yield from batch
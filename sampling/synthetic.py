@@ -0,0 +1,94 @@
+# sampling/synthetic.py — Synthetic stand-in for psutil.net_io_counters() for stress and load runs.
+
+import time
+from typing import NamedTuple
+
+SHAPES = ("constant", "bursty", "sawtooth")
+
+
+class snetio(NamedTuple):
+    # Same fields as psutil's snetio so RateMeter can't tell the difference.
+    bytes_sent: int
+    bytes_recv: int
+    packets_sent: int
+    packets_recv: int
+    errin: int
+    errout: int
+    dropin: int
+    dropout: int
+
+
+class SyntheticCounters:
+    """Callable with the psutil.net_io_counters() signature, driven by a traffic shape.
+
+    Counters are the closed-form integral of the shape's rate over the clock,
+    so they stay consistent however often (or irregularly) they are read —
+    a 5 kHz sampler sees the same traffic as a 1 Hz one.
+
+    shape:       "constant", "bursty" (on for `duty` of each period at
+                 rate / duty, idle otherwise) or "sawtooth" (ramps 0 → 2·rate).
+    rate:        mean received bytes/s per interface; sent is `tx_ratio` of it.
+    interfaces:  number of fake NICs, phase-shifted so bursts don't line up.
+    """
+
+    def __init__(
+        self,
+        shape="constant",
+        rate=1 << 20,
+        interfaces=1,
+        period=1.0,
+        duty=0.1,
+        tx_ratio=0.25,
+        packet_size=800,
+        drop_ratio=0.0,
+        clock=time.monotonic,
+    ):
+        if shape not in SHAPES:
+            raise ValueError(f"unknown traffic shape {shape!r}; expected one of {SHAPES}")
+        self.shape = shape
+        self.rate = float(rate)
+        self.period = float(period)
+        self.duty = min(max(float(duty), 0.01), 1.0)
+        self.tx_ratio = tx_ratio
+        self.packet_size = packet_size
+        self.drop_ratio = drop_ratio
+        self.clock = clock
+        self.names = [f"synth{i}" for i in range(max(1, interfaces))]
+        self._t0 = clock()
+
+    def _received(self, t, phase):
+        """Bytes received by one interface after `t` seconds."""
+        r, p = self.rate, self.period
+        if self.shape == "constant":
+            return r * t
+        cycles, f = divmod(t + phase, p)
+        if self.shape == "sawtooth":
+            partial = r * f * f / p
+        else:  # bursty
+            partial = (r / self.duty) * min(f, self.duty * p)
+        # Each full period carries r·p bytes whichever shape it is.
+        return cycles * r * p + partial
+
+    def _nic(self, t, i):
+        phase = self.period * i / max(len(self.names), 1)
+        recv = int(self._received(t, phase) - self._received(0.0, phase))
+        sent = int(recv * self.tx_ratio)
+        pkts_recv = recv // self.packet_size
+        pkts_sent = sent // self.packet_size
+        return snetio(
+            bytes_sent=sent,
+            bytes_recv=recv,
+            packets_sent=pkts_sent,
+            packets_recv=pkts_recv,
+            errin=0,
+            errout=0,
+            dropin=int(pkts_recv * self.drop_ratio),
+            dropout=int(pkts_sent * self.drop_ratio),
+        )
+
+    def __call__(self, pernic=False, nowrap=True):
+        t = self.clock() - self._t0
+        nics = {name: self._nic(t, i) for i, name in enumerate(self.names)}
+        if pernic:
+            return nics
+        return snetio(*(sum(col) for col in zip(*nics.values())))
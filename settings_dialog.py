@@ -3,7 +3,7 @@
 from PyQt5 import QtWidgets, QtGui
 from PyQt5.QtGui import QColor
 from config import Config
-from startup import install_startup, remove_startup
+import units
 
 
 class SettingsDialog(QtWidgets.QDialog):
@@ -33,9 +33,7 @@ class SettingsDialog(QtWidgets.QDialog):
 
         # Speed Unit
         self.unit_combo = QtWidgets.QComboBox()
-        self.unit_combo.addItems(
-            ["auto", "B/s", "KB/s", "MB/s", "b/s", "Kib/s", "Mib/s"]
-        )
+        self.unit_combo.addItems(units.UNITS)
         layout.addRow("Speed Unit:", self.unit_combo)
 
         # Decimal Precision
@@ -90,6 +88,38 @@ class SettingsDialog(QtWidgets.QDialog):
         self.btn_ul.clicked.connect(lambda: self._pick("upload_color", self.btn_ul))
         layout.addRow("Upload Color:", self.btn_ul)
 
+        # Packet / error / drop rates
+        self.packets_chk = QtWidgets.QCheckBox("Show Packets, Errors && Drops")
+        layout.addRow(self.packets_chk)
+
+        # Long-term history log
+        self.log_chk = QtWidgets.QCheckBox("Record Long-Term History")
+        layout.addRow(self.log_chk)
+        self.log_days_spin = QtWidgets.QSpinBox()
+        self.log_days_spin.setRange(0, 3650)
+        self.log_days_spin.setSpecialValueText("Forever")
+        self.log_days_spin.setSuffix(" days")
+        self.log_chk.toggled.connect(self.log_days_spin.setEnabled)
+        layout.addRow("Keep History For:", self.log_days_spin)
+
+        # Interfaces to count (fnmatch patterns, "!" excludes; empty = all)
+        self.ifaces_edit = QtWidgets.QLineEdit()
+        self.ifaces_edit.setPlaceholderText("all — e.g. eth*, wlan0, !veth*")
+        layout.addRow("Interfaces:", self.ifaces_edit)
+
+        # Latency probes (TCP connect time, drawn on the graph)
+        self.latency_edit = QtWidgets.QLineEdit()
+        self.latency_edit.setPlaceholderText("e.g. 1.1.1.1:443, example.com:80")
+        layout.addRow("Latency Targets:", self.latency_edit)
+        self.latency_spin = QtWidgets.QDoubleSpinBox()
+        self.latency_spin.setRange(0.5, 3600.0)
+        self.latency_spin.setSuffix(" s")
+        layout.addRow("Probe Every:", self.latency_spin)
+
+        # Shared memory for other local tools
+        self.shm_chk = QtWidgets.QCheckBox("Share Live Samples With Local Tools")
+        layout.addRow(self.shm_chk)
+
         # Launch at Startup
         self.boot_chk = QtWidgets.QCheckBox("Launch at Startup")
         layout.addRow(self.boot_chk)
@@ -117,12 +147,20 @@ class SettingsDialog(QtWidgets.QDialog):
         # Convert stored MB/s threshold to whatever unit is currently displayed.
         stored_mb = d["notify_threshold"].get("download") or 0.0
         self.threshold_spin.setValue(
-            self._threshold_mb_to_display(stored_mb, self._threshold_unit)
+            units.mb_to_display(stored_mb, self._threshold_unit)
         )
         self.opacity_spin.setValue(d.get("opacity", 0.8) * 100)
         self.font_combo.setCurrentFont(QtGui.QFont(d.get("font", "Segoe UI")))
         self.font_size_spin.setValue(d.get("font_size", 10))
         self.boot_chk.setChecked(d["start_on_boot"])
+        self.packets_chk.setChecked(d.get("show_packet_stats", False))
+        self.log_chk.setChecked(d.get("history_log", True))
+        self.log_days_spin.setValue(d.get("history_log_days", 90))
+        self.log_days_spin.setEnabled(self.log_chk.isChecked())
+        self.ifaces_edit.setText(", ".join(d.get("interfaces") or []))
+        self.latency_edit.setText(", ".join(d.get("latency_targets") or []))
+        self.latency_spin.setValue(d.get("latency_interval", 5.0))
+        self.shm_chk.setChecked(d.get("shared_memory", True))
 
         for key, btn in [
             ("alert_color", self.btn_alert),
@@ -145,66 +183,56 @@ class SettingsDialog(QtWidgets.QDialog):
     def _on_unit_changed(self, new_unit):
         # Rescale the threshold value so the logical threshold stays the same.
         # Threshold is always stored and compared in MB/s internally.
-        old_mb = self._threshold_display_to_mb(
+        old_mb = units.display_to_mb(
             self.threshold_spin.value(), self._threshold_unit
         )
         self._threshold_unit = new_unit
         self._update_threshold_display(new_unit)
-        self.threshold_spin.setValue(self._threshold_mb_to_display(old_mb, new_unit))
+        self.threshold_spin.setValue(units.mb_to_display(old_mb, new_unit))
 
     def _update_threshold_display(self, unit):
         """Sync the threshold spin's suffix, range, and step for the given unit."""
         label = unit if unit != "auto" else "MB/s"
-        max_val = self._threshold_mb_to_display(1000.0, unit)
+        max_val = units.mb_to_display(1000.0, unit)
         step = max(0.01, max_val / 10000)
         self.threshold_spin.setSuffix(f" {label}")
         self.threshold_spin.setRange(0.0, max_val)
         self.threshold_spin.setSingleStep(round(step, 4))
 
-    def _threshold_display_to_mb(self, val, unit):
-        """Convert a threshold value in the display unit to MB/s (internal storage)."""
-        factors = {
-            "auto": 1,
-            "B/s": 1 / (1 << 20),
-            "KB/s": 1 / 1024,
-            "MB/s": 1,
-            "b/s": 1 / (8 * (1 << 20)),
-            "Kib/s": 1 / (8 * 1024),
-            "Mib/s": 1 / 8,
-        }
-        return val * factors.get(unit, 1)
-
-    def _threshold_mb_to_display(self, mb_val, unit):
-        """Convert a MB/s threshold value to the given display unit."""
-        factors = {
-            "auto": 1,
-            "B/s": 1 << 20,
-            "KB/s": 1024,
-            "MB/s": 1,
-            "b/s": 8 * (1 << 20),
-            "Kib/s": 8 * 1024,
-            "Mib/s": 8,
-        }
-        return mb_val * factors.get(unit, 1)
-
     def accept(self):
         d = self.config.data
         d["update_interval"] = self.interval.value()
         d["unit"] = self.unit_combo.currentText()
         d["precision"] = self.prec_spin.value()
         raw_thr = self.threshold_spin.value()
-        mb_thr = self._threshold_display_to_mb(raw_thr, self._threshold_unit)
+        mb_thr = units.display_to_mb(raw_thr, self._threshold_unit)
         d["notify_threshold"]["download"] = mb_thr if mb_thr > 0 else None
         d["opacity"] = self.opacity_spin.value() / 100.0
         d["font"] = self.font_combo.currentFont().family()
         d["font_size"] = self.font_size_spin.value()
         d["start_on_boot"] = self.boot_chk.isChecked()
         d["font_bold"] = self.bold_check.isChecked()
-
-        self.config.save()
+        d["show_packet_stats"] = self.packets_chk.isChecked()
+        d["history_log"] = self.log_chk.isChecked()
+        d["history_log_days"] = self.log_days_spin.value()
+        d["interfaces"] = [
+            t.strip() for t in self.ifaces_edit.text().split(",") if t.strip()
+        ]
+        d["latency_targets"] = [
+            t.strip() for t in self.latency_edit.text().split(",") if t.strip()
+        ]
+        d["latency_interval"] = self.latency_spin.value()
+        d["shared_memory"] = self.shm_chk.isChecked()
+
+        # commit() saves and tells the overlay and graph which fields changed.
+        self.config.commit()
 
         if d["start_on_boot"]:
             try:
+                # Imported here: startup.py needs pywin32, which only exists on
+                # Windows, and the rest of the app (and bench/) runs without it.
+                from startup import install_startup
+
                 install_startup()
             except Exception as e:
                 QtWidgets.QMessageBox.warning(
@@ -214,11 +242,10 @@ class SettingsDialog(QtWidgets.QDialog):
                 self.config.save()
         else:
             try:
+                from startup import remove_startup
+
                 remove_startup()
             except Exception:
                 pass  # file already gone, nothing to do
 
-        if self.parent_widget and hasattr(self.parent_widget, "apply_settings"):
-            self.parent_widget.apply_settings()
-
         super().accept()
@@ -0,0 +1,142 @@
+# shared_reader.py — Reads TinyNetUse's live samples from shared memory in another process.
+#
+#   from shared_reader import SampleReader
+#   with SampleReader() as r:
+#       t, elapsed, values = r.latest()        # values = dict field -> rate
+#       for t, elapsed, values in r.history(60): ...
+#
+# Attaching maps the segment once; after that a read is a few unpack_from
+# calls on the mapped buffer with no syscalls and no copy of the ring.
+
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+from shared_samples import (
+    COUNT_OFFSET,
+    HEADER,
+    MAGIC,
+    NAME_SIZE,
+    NAMES_OFFSET,
+    SEQ_OFFSET,
+    U64,
+    VERSION,
+    default_name,
+    record_struct,
+    ring_offset,
+)
+
+# Give up on a snapshot after this many torn reads (the writer would have to
+# be publishing continuously for that to happen). Every YIELD_EVERY retries
+# the reader gives up its time slice so a writer on the same core can finish.
+MAX_RETRIES = 100_000
+YIELD_EVERY = 64
+
+
+class NotPublishing(Exception):
+    """No TinyNetUse segment with that name, or one in an unknown format."""
+
+
+class TornRead(Exception):
+    """The writer kept the seqlock busy for MAX_RETRIES attempts."""
+
+
+def _attach(name):
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name, track=False)
+    shm = shared_memory.SharedMemory(name)
+    # Before 3.13 attaching also registers the segment with this process's
+    # resource tracker, which would unlink it (out from under the publisher)
+    # when the reader exits.
+    if sys.platform != "win32":
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+class SampleReader:
+    def __init__(self, name=None):
+        try:
+            self._shm = _attach(name or default_name())
+        except FileNotFoundError:
+            raise NotPublishing(name or default_name()) from None
+        buf = self._shm.buf
+        magic, version, nfields, capacity, record_size = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise NotPublishing(f"unknown segment format (version {version})")
+        self.fields = tuple(
+            bytes(buf[NAMES_OFFSET + i * NAME_SIZE:NAMES_OFFSET + (i + 1) * NAME_SIZE])
+            .rstrip(b"\0")
+            .decode("ascii")
+            for i in range(nfields)
+        )
+        self.capacity = capacity
+        self.retries = 0  # torn reads retried so far, for diagnostics
+        self._record = record_struct(nfields)
+        if self._record.size != record_size:
+            self.close()
+            raise NotPublishing("record size mismatch")
+        self._ring = ring_offset(nfields)
+        self._buf = buf
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._shm is not None:
+            self._buf = None
+            self._shm.close()
+            self._shm = None
+
+    def count(self):
+        """Total records published so far (monotonic; not a snapshot read)."""
+        return U64.unpack_from(self._buf, COUNT_OFFSET)[0]
+
+    def _snapshot(self, read):
+        buf = self._buf
+        for attempt in range(1, MAX_RETRIES + 1):
+            seq = U64.unpack_from(buf, SEQ_OFFSET)[0]
+            if not seq & 1:
+                count = U64.unpack_from(buf, COUNT_OFFSET)[0]
+                result = read(count)
+                if U64.unpack_from(buf, SEQ_OFFSET)[0] == seq:
+                    return result
+            self.retries += 1
+            if attempt % YIELD_EVERY == 0:
+                time.sleep(0)
+        raise TornRead(f"no consistent snapshot after {MAX_RETRIES} attempts")
+
+    def _raw(self, count, n):
+        # The n newest records, oldest first, as tuples (time, elapsed, *values).
+        size, ring, cap = self._record.size, self._ring, self.capacity
+        unpack = self._record.unpack_from
+        buf = self._buf
+        return [unpack(buf, ring + (i % cap) * size) for i in range(count - n, count)]
+
+    def latest_raw(self):
+        """(time, elapsed, *values) of the newest record, or None; the fast path."""
+        def read(count):
+            if not count:
+                return None
+            return self._record.unpack_from(
+                self._buf, self._ring + ((count - 1) % self.capacity) * self._record.size
+            )
+
+        return self._snapshot(read)
+
+    def latest(self):
+        """(time, elapsed, {field: value}) of the newest record, or None."""
+        rec = self.latest_raw()
+        if rec is None:
+            return None
+        return rec[0], rec[1], dict(zip(self.fields, rec[2:]))
+
+    def history(self, n=None):
+        """Up to `n` (default: the whole ring) newest records, oldest first,
+        as (time, elapsed, {field: value})."""
+        n = self.capacity if n is None else min(n, self.capacity)
+        recs = self._snapshot(lambda count: self._raw(count, min(n, count)))
+        return [(r[0], r[1], dict(zip(self.fields, r[2:]))) for r in recs]
@@ -0,0 +1,128 @@
+# shared_samples.py — Publishes live samples into a named shared-memory segment so other
+# local processes can read them without polling the OS themselves.
+#
+# Layout (little-endian, fixed; readers check MAGIC and VERSION):
+#
+#   header   magic 8s | version u32 | nfields u32 | capacity u32 | record_size u32
+#            | seq u64 | count u64                                  (40 bytes)
+#   names    nfields × 16-byte NUL-padded ASCII field names
+#   ring     capacity × record; record = time f64 | elapsed f64 | nfields × f64
+#
+# `count` is the total number of records ever written; the newest is at slot
+# (count - 1) % capacity. `seq` is a seqlock: odd while a record is being
+# written, even otherwise. Readers retry until they see the same even seq
+# before and after reading (see shared_reader.py).
+#
+# Only stdlib is used here and in shared_reader.py, so readers need neither
+# Qt nor psutil.
+
+import getpass
+import struct
+from multiprocessing import shared_memory
+
+MAGIC = b"TNUSHM1\0"
+VERSION = 1
+
+HEADER = struct.Struct("<8sIIII")  # magic, version, nfields, capacity, record_size
+SEQ_OFFSET = HEADER.size  # u64 seq
+COUNT_OFFSET = SEQ_OFFSET + 8  # u64 count
+NAMES_OFFSET = COUNT_OFFSET + 8
+NAME_SIZE = 16
+
+U64 = struct.Struct("<Q")
+
+DEFAULT_CAPACITY = 600
+
+
+def default_name() -> str:
+    # Per user, like the single-instance socket; POSIX caps names at ~30 chars.
+    try:
+        user = getpass.getuser()
+    except Exception:
+        user = "default"
+    return f"tinynetuse_{user}"[:30]
+
+
+def record_struct(nfields):
+    return struct.Struct(f"<dd{nfields}d")
+
+
+def ring_offset(nfields):
+    return NAMES_OFFSET + nfields * NAME_SIZE
+
+
+def segment_size(nfields, capacity):
+    return ring_offset(nfields) + capacity * record_struct(nfields).size
+
+
+class SamplePublisher:
+    """Writer side: creates the segment and appends one record per sample.
+
+    A publish is a handful of pack_into calls into the mapped buffer, with
+    one writer per segment and no explicit memory barriers. That relies on
+    the CPU keeping stores in program order, as x86 (TSO) does. On weakly
+    ordered CPUs such as ARM a reader may see the new seq before the record
+    or count it guards. What protects readers is their re-check of seq after
+    reading and retry on a torn read (shared_reader.py), not any ordering
+    guarantee from this side; without barriers that is best effort on such
+    CPUs rather than a formal guarantee.
+    """
+
+    def __init__(self, fields, name=None, capacity=DEFAULT_CAPACITY):
+        self.fields = tuple(fields)
+        self.name = name or default_name()
+        self.capacity = capacity
+        self._record = record_struct(len(self.fields))
+        self._ring = ring_offset(len(self.fields))
+        size = segment_size(len(self.fields), capacity)
+        try:
+            self._shm = shared_memory.SharedMemory(self.name, create=True, size=size)
+        except FileExistsError:
+            # Left behind by a crashed run (only one instance runs per user,
+            # see single_instance.py): replace it.
+            stale = shared_memory.SharedMemory(self.name)
+            stale.close()
+            stale.unlink()
+            self._shm = shared_memory.SharedMemory(self.name, create=True, size=size)
+        self._buf = self._shm.buf
+        self._seq = 0
+        self._count = 0
+
+        # Header last, with seq/count zero, so a reader never sees a valid
+        # magic over an uninitialised ring.
+        for i, field in enumerate(self.fields):
+            encoded = field.encode("ascii")[:NAME_SIZE]
+            self._buf[NAMES_OFFSET + i * NAME_SIZE:NAMES_OFFSET + (i + 1) * NAME_SIZE] = (
+                encoded.ljust(NAME_SIZE, b"\0")
+            )
+        U64.pack_into(self._buf, SEQ_OFFSET, 0)
+        U64.pack_into(self._buf, COUNT_OFFSET, 0)
+        HEADER.pack_into(
+            self._buf, 0, MAGIC, VERSION, len(self.fields), capacity, self._record.size
+        )
+
+    def publish(self, t, elapsed, values):
+        buf = self._buf
+        slot = self._count % self.capacity
+        self._seq += 1  # odd: write in progress
+        U64.pack_into(buf, SEQ_OFFSET, self._seq)
+        self._record.pack_into(buf, self._ring + slot * self._record.size, t, elapsed, *values)
+        self._count += 1
+        U64.pack_into(buf, COUNT_OFFSET, self._count)
+        self._seq += 1  # even: consistent again
+        U64.pack_into(buf, SEQ_OFFSET, self._seq)
+
+    def publish_sample(self, sample):
+        """Slot for QtSampler.sampled: publish a sampling.Sample."""
+        self.publish(sample.time, sample.elapsed, sample.rates())
+
+    def close(self):
+        if self._shm is None:
+            return
+        self._buf = None  # the memoryview must go before the mapping can close
+        self._shm.close()
+        try:
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
+        self._shm = None
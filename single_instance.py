@@ -0,0 +1,77 @@
+# single_instance.py — Keeps one TinyNetUse per user and forwards launch commands to it.
+
+import getpass
+
+from PyQt5 import QtCore, QtNetwork
+
+COMMANDS = ("show", "graph", "settings", "quit")
+
+
+def _server_name() -> str:
+    # Scope the name to the user so two people on the same machine each get
+    # their own instance (the Startup shortcut is per-user too).
+    try:
+        user = getpass.getuser()
+    except Exception:
+        user = "default"
+    return f"TinyNetUse-{user}"
+
+
+def send_to_running(command: str, timeout_ms: int = 250) -> bool:
+    """Hand `command` to an already running instance. Returns False if none answered.
+
+    Only uses blocking socket calls, so it works before a QApplication exists —
+    a second launch can exit without paying for app, window or icon setup.
+    """
+    sock = QtNetwork.QLocalSocket()
+    sock.connectToServer(_server_name())
+    if not sock.waitForConnected(timeout_ms):
+        return False
+    sock.write(command.encode("ascii") + b"\n")
+    sock.waitForBytesWritten(timeout_ms)
+    sock.disconnectFromServer()
+    if sock.state() != QtNetwork.QLocalSocket.UnconnectedState:
+        sock.waitForDisconnected(timeout_ms)
+    return True
+
+
+class InstanceServer(QtCore.QObject):
+    command_received = QtCore.pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._server = QtNetwork.QLocalServer(self)
+        self._server.setSocketOptions(QtNetwork.QLocalServer.UserAccessOption)
+        self._server.newConnection.connect(self._on_new_connection)
+
+    def listen(self) -> bool:
+        """Claim the instance name. Returns False if another live instance owns it."""
+        name = _server_name()
+        if self._server.listen(name):
+            return True
+        if self._server.serverError() != QtNetwork.QAbstractSocket.AddressInUseError:
+            return False
+        # Either a live instance won the race, or a crashed one left its socket
+        # file behind (Unix). Only clean up once nobody answers on it.
+        probe = QtNetwork.QLocalSocket()
+        probe.connectToServer(name)
+        if probe.waitForConnected(100):
+            probe.disconnectFromServer()
+            return False
+        QtNetwork.QLocalServer.removeServer(name)
+        return self._server.listen(name)
+
+    def _on_new_connection(self):
+        while self._server.hasPendingConnections():
+            sock = self._server.nextPendingConnection()
+            sock.readyRead.connect(lambda s=sock: self._read_commands(s))
+            sock.disconnected.connect(sock.deleteLater)
+            # The client writes and disconnects straight away, so the line may
+            # already be buffered before readyRead was connected.
+            self._read_commands(sock)
+
+    def _read_commands(self, sock):
+        while sock.canReadLine():
+            cmd = bytes(sock.readLine()).decode("ascii", "ignore").strip()
+            if cmd in COMMANDS:
+                self.command_received.emit(cmd)
@@ -0,0 +1,215 @@
+# talkers.py — Attributes traffic to processes and remote endpoints ("top talkers").
+#
+# psutil has no per-process network counters, so a process's rate is its I/O
+# rate (read/write chars where the OS reports them, which include socket I/O)
+# for processes that own at least one connection, split evenly across their
+# remote endpoints. It's an estimate — good enough to answer "which process?".
+
+import time
+from typing import NamedTuple
+
+import psutil
+
+
+class Talker(NamedTuple):
+    pid: int
+    name: str
+    rx: float  # bytes/s
+    tx: float
+    connections: int
+    endpoints: tuple  # "ip:port" strings, most connections first
+
+
+class Endpoint(NamedTuple):
+    address: str
+    rx: float
+    tx: float
+    processes: tuple  # names
+
+
+class Snapshot(NamedTuple):
+    time: float
+    talkers: list  # Talker, busiest first
+    endpoints: list  # Endpoint, busiest first
+    error: str = ""
+
+
+def _addr(a):
+    return f"{a.ip}:{a.port}" if a else ""
+
+
+class ConnectionTable:
+    """psutil.net_connections() kept as a keyed table and diffed incrementally.
+
+    Only added/removed rows touch the per-process endpoint counts, so a
+    refresh costs one (unavoidable) syscall plus O(changes) bookkeeping.
+    """
+
+    def __init__(self, kind="inet", connections=None):
+        self.kind = kind
+        self._connections = connections or psutil.net_connections
+        self._rows = set()  # (pid, laddr, raddr)
+        self.by_pid = {}  # pid -> {raddr: connection count}
+
+    def refresh(self):
+        """Re-read the table. Returns (added, removed) row sets."""
+        rows = {
+            (c.pid, _addr(c.laddr), _addr(c.raddr))
+            for c in self._connections(kind=self.kind)
+            if c.pid and c.raddr
+        }
+        added = rows - self._rows
+        removed = self._rows - rows
+        for pid, _, raddr in removed:
+            counts = self.by_pid.get(pid)
+            if counts is None:
+                continue
+            counts[raddr] -= 1
+            if counts[raddr] <= 0:
+                del counts[raddr]
+            if not counts:
+                del self.by_pid[pid]
+        for pid, _, raddr in added:
+            counts = self.by_pid.setdefault(pid, {})
+            counts[raddr] = counts.get(raddr, 0) + 1
+        self._rows = rows
+        return added, removed
+
+
+class ProcessCache:
+    """PID → (create_time, name, psutil.Process), looked up once per PID.
+
+    TopTalkers evicts a PID whenever it (re)appears in the connection table,
+    so a recycled PID is never reported under the old process's name.
+    Processes we may not inspect stay cached too, as a denied marker, so they
+    cost one failed lookup per stay in the table rather than one per sample.
+    """
+
+    def __init__(self):
+        self._procs = {}  # pid -> (create_time, name, Process or None if denied)
+
+    def get(self, pid):
+        """The cached entry, or None for a process that is gone or denied."""
+        entry = self._procs.get(pid)
+        if entry is None:
+            try:
+                proc = psutil.Process(pid)
+                with proc.oneshot():
+                    entry = (proc.create_time(), proc.name(), proc)
+            except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                return None
+            except psutil.AccessDenied:
+                entry = (None, None, None)
+            self._procs[pid] = entry
+        return entry if entry[2] is not None else None
+
+    def deny(self, pid):
+        """Mark a cached process as unreadable (e.g. its I/O counters)."""
+        entry = self._procs.get(pid)
+        if entry is not None:
+            self._procs[pid] = (entry[0], entry[1], None)
+
+    def retain(self, pids):
+        """Drop cached processes whose PIDs no longer own a connection."""
+        for pid in list(self._procs):
+            if pid not in pids:
+                del self._procs[pid]
+
+    def evict(self, pid):
+        self._procs.pop(pid, None)
+
+
+def _io_totals(proc):
+    io = proc.io_counters()
+    # *_chars include socket traffic on Linux; elsewhere fall back to bytes.
+    rx = getattr(io, "read_chars", None)
+    tx = getattr(io, "write_chars", None)
+    if rx is None:
+        rx = io.read_bytes + getattr(io, "other_bytes", 0)
+        tx = io.write_bytes
+    return rx, tx
+
+
+class TopTalkers:
+    """Samples per-process I/O every call and the connection table every
+    `table_interval` seconds (it is the expensive part)."""
+
+    def __init__(self, table_interval=10.0, limit=10, table=None):
+        self.table_interval = table_interval
+        self.limit = limit
+        self.table = table or ConnectionTable()
+        self.processes = ProcessCache()
+        self._table_at = None
+        self._last_io = {}  # pid -> (time, rx, tx)
+
+    def sample(self, now=None):
+        now = time.monotonic() if now is None else now
+        error = ""
+        if self._table_at is None or now - self._table_at >= self.table_interval:
+            before = set(self.table.by_pid)
+            try:
+                added, removed = self.table.refresh()
+            except psutil.AccessDenied:
+                error = "Access denied reading connections (try running elevated)"
+            else:
+                self._table_at = now
+                live = self.table.by_pid.keys()
+                for pid in {row[0] for row in added} - before:
+                    self.processes.evict(pid)
+                    self._last_io.pop(pid, None)
+                if removed:
+                    self.processes.retain(live)
+                    for pid in [p for p in self._last_io if p not in live]:
+                        del self._last_io[pid]
+
+        talkers = []
+        for pid, counts in self.table.by_pid.items():
+            entry = self.processes.get(pid)
+            if entry is None:
+                continue
+            _, name, proc = entry
+            try:
+                rx, tx = _io_totals(proc)
+            except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                self.processes.evict(pid)
+                continue
+            except psutil.AccessDenied:
+                self.processes.deny(pid)
+                continue
+            except AttributeError:
+                # Process.io_counters() doesn't exist on macOS.
+                error = "Per-process I/O isn't reported on this platform"
+                talkers = []
+                break
+            prev = self._last_io.get(pid)
+            self._last_io[pid] = (now, rx, tx)
+            if prev is None or now <= prev[0]:
+                continue  # first sight of this process: just a baseline
+            dt = now - prev[0]
+            endpoints = tuple(sorted(counts, key=counts.get, reverse=True))
+            talkers.append(
+                Talker(
+                    pid,
+                    name,
+                    max(rx - prev[1], 0) / dt,
+                    max(tx - prev[2], 0) / dt,
+                    sum(counts.values()),
+                    endpoints,
+                )
+            )
+
+        talkers.sort(key=lambda t: t.rx + t.tx, reverse=True)
+        return Snapshot(time.time(), talkers[: self.limit], self._endpoints(talkers), error)
+
+    def _endpoints(self, talkers):
+        rates = {}  # address -> [rx, tx, names]
+        for t in talkers:
+            share = 1.0 / max(len(t.endpoints), 1)
+            for addr in t.endpoints:
+                r = rates.setdefault(addr, [0.0, 0.0, []])
+                r[0] += t.rx * share
+                r[1] += t.tx * share
+                r[2].append(t.name)
+        out = [Endpoint(a, rx, tx, tuple(names)) for a, (rx, tx, names) in rates.items()]
+        out.sort(key=lambda e: e.rx + e.tx, reverse=True)
+        return out[: self.limit]
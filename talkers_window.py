@@ -0,0 +1,139 @@
+# talkers_window.py — "Top Talkers" panel. Sampling runs on a worker thread, never the GUI thread.
+
+from PyQt5 import QtCore, QtWidgets
+from PyQt5.QtCore import Qt
+
+from config import Config
+from talkers import TopTalkers
+import units
+
+# Every panel's worker thread with its worker, including those of panels
+# already closed: closing doesn't wait for a psutil walk in progress, so a
+# thread can outlive its panel. stop_workers() waits for them at quit, before
+# Qt would destroy one still running.
+_workers = []  # (QThread, TalkersWorker)
+
+
+def stop_workers():
+    """Stop every worker thread and wait for it; for QApplication.aboutToQuit."""
+    for thread, worker in _workers:
+        if thread.isFinished():
+            continue
+        try:
+            # The worker quits its own thread once the stop runs; quitting it
+            # from here could end the loop before the queued stop was seen.
+            QtCore.QMetaObject.invokeMethod(worker, "stop", Qt.QueuedConnection)
+        except RuntimeError:
+            pass  # deleted as its thread finished
+        thread.wait()
+    _workers.clear()
+
+
+class TalkersWorker(QtCore.QObject):
+    """Lives on its own QThread; both psutil walks happen there."""
+
+    updated = QtCore.pyqtSignal(object)  # talkers.Snapshot
+
+    def __init__(self, interval, table_interval):
+        super().__init__()
+        self.interval = interval
+        self.table_interval = table_interval
+        self._timer = None
+        self._talkers = None
+
+    @QtCore.pyqtSlot()
+    def start(self):
+        # Created here so the timer and TopTalkers belong to the worker thread.
+        self._talkers = TopTalkers(table_interval=self.table_interval)
+        self._timer = QtCore.QTimer(self)
+        self._timer.timeout.connect(self._tick)
+        self._timer.start(int(self.interval * 1000))
+        self._tick()
+
+    @QtCore.pyqtSlot()
+    def stop(self):
+        # Queued behind any tick in progress; the thread then winds down by itself.
+        if self._timer is not None:
+            self._timer.stop()
+        self.thread().quit()
+
+    def _tick(self):
+        self.updated.emit(self._talkers.sample())
+
+
+class TopTalkersWindow(QtWidgets.QDialog):
+    closed = QtCore.pyqtSignal()
+    _stop = QtCore.pyqtSignal()  # queued to the worker thread
+
+    COLUMNS = ("Process", "PID", "↓", "↑", "Conns", "Endpoints")
+
+    def __init__(self, parent=None, config=None):
+        super().__init__(parent)
+        self.config = config or Config()
+        s = self.config.settings
+        self.setWindowTitle("Top Talkers")
+        self.setWindowFlags(Qt.Tool | Qt.WindowStaysOnTopHint)
+        self.resize(560, 300)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        self.table = QtWidgets.QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.verticalHeader().hide()
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.table)
+        self.status = QtWidgets.QLabel("Collecting…")
+        layout.addWidget(self.status)
+
+        # ── Worker Thread ──
+        # Owned by _workers rather than the panel, which is deleted on close
+        # while the thread may still be finishing a tick. Finished threads of
+        # earlier panels are released here.
+        _workers[:] = [(t, w) for t, w in _workers if not t.isFinished()]
+        self._thread = QtCore.QThread()
+        self._worker = TalkersWorker(s.talkers_interval, s.talkers_table_interval)
+        self._worker.moveToThread(self._thread)
+        self._thread.started.connect(self._worker.start)
+        self._thread.finished.connect(self._worker.deleteLater)
+        self._worker.updated.connect(self._show_snapshot)
+        self._stop.connect(self._worker.stop)
+        _workers.append((self._thread, self._worker))
+        self._thread.start()
+
+    def _show_snapshot(self, snap):
+        s = self.config.settings
+        fmt_rate = units.formatter(s.unit, s.precision).text
+        self.table.setRowCount(len(snap.talkers))
+        for row, t in enumerate(snap.talkers):
+            cells = (
+                t.name,
+                str(t.pid),
+                fmt_rate(t.rx),
+                fmt_rate(t.tx),
+                str(t.connections),
+                ", ".join(t.endpoints[:3]) + (" …" if len(t.endpoints) > 3 else ""),
+            )
+            for col, text in enumerate(cells):
+                item = QtWidgets.QTableWidgetItem(text)
+                if col in (1, 2, 3, 4):
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table.setItem(row, col, item)
+        if snap.error:
+            self.status.setText(snap.error)
+        elif snap.endpoints:
+            top = snap.endpoints[0]
+            self.status.setText(
+                f"Busiest endpoint: {top.address} "
+                f"({fmt_rate(top.rx + top.tx)}, {', '.join(sorted(set(top.processes)))})"
+            )
+        else:
+            self.status.setText("No active connections")
+
+    def closeEvent(self, event):
+        # Stop sampling entirely while the panel isn't open, without waiting
+        # for a psutil walk in progress (stop_workers() does that at quit).
+        if self._thread is not None:
+            self._stop.emit()
+            self._thread = None
+        self.closed.emit()
+        event.accept()
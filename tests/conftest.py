@@ -0,0 +1,6 @@
+# conftest.py — Puts the application modules (kept flat at the repo root) on the path.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
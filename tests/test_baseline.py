@@ -0,0 +1,42 @@
+# test_baseline.py — Per-segment baseline loads agree with the log's own records.
+
+from baseline import DAY, Envelope, segment_envelope, segment_shifted
+from history_log import HistoryLog
+
+FIELDS = ("rx", "tx", "rx_packets")
+T0 = 1_760_000_000.0
+
+
+def _log(tmp_path):
+    log = HistoryLog(tmp_path, FIELDS, retention_days=0)
+    for i in range(3 * 3600):
+        log.append(T0 + i, [1000.0 + (i % 977) * 50, 10.0 * (i % 13), 1.0])
+    log.close()
+    return log
+
+
+def test_segment_envelope_matches_records(tmp_path):
+    log = _log(tmp_path)
+    t0, t1 = T0 + 600, T0 + 9000
+    expected = Envelope()
+    for t, values in log.query(t0, t1):
+        expected.add(t, values[0], log.resolution)
+    env = Envelope()
+    for day in log.days_between(t0, t1):
+        env.merge(segment_envelope(log.segment_path(day), FIELDS, t0, t1, "rx", log.resolution))
+    assert env.stats() == expected.stats()
+
+
+def test_segment_shifted_moves_kept_fields(tmp_path):
+    log = _log(tmp_path)
+    t0, t1 = T0 + 100, T0 + 200
+    records = list(log.query(t0, t1))
+    times, cols = [], [[], []]
+    for day in log.days_between(t0, t1):
+        path = log.segment_path(day)
+        part_times, part_cols = segment_shifted(path, FIELDS, t0, t1, DAY, ("rx", "tx"))
+        times += part_times
+        for col, part in zip(cols, part_cols):
+            col += part
+    assert times == [t + DAY for t, _ in records]
+    assert cols == [[v[0] for _, v in records], [v[1] for _, v in records]]
@@ -0,0 +1,27 @@
+# test_config.py — Config never shares mutable defaults, and fallbacks are validated too.
+
+import json
+
+from config import DEFAULTS, Config, Settings
+
+
+def test_missing_keys_do_not_alias_defaults(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"font_size": 12}))
+    before = json.dumps(DEFAULTS, sort_keys=True)
+    cfg = Config(path)
+    cfg.data["overlays"].append({"name": "WAN", "interfaces": ["eth0"]})
+    cfg.data["interfaces"].append("eth0")
+    cfg.data["latency_targets"].append("1.1.1.1:443")
+    assert json.dumps(DEFAULTS, sort_keys=True) == before
+    assert [o.name for o in cfg.settings.overlays] == []
+    assert [o.name for o in Settings.from_dict(cfg.data).overlays] == ["WAN"]
+
+
+def test_invalid_value_falls_back_to_checked_default():
+    good = Settings.from_dict(DEFAULTS)
+    bad = Settings.from_dict(dict(DEFAULTS, interfaces=5, latency_targets=None, overlays=3))
+    assert bad.interfaces == good.interfaces == ()
+    assert isinstance(bad.latency_targets, tuple)
+    assert bad.overlays == ()
+    assert not bad.diff(good)
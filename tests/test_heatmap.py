@@ -0,0 +1,33 @@
+# test_heatmap.py — Backfilling an empty Heatmap in one go paints what per-sample adds do.
+
+import random
+
+from heatmap import Heatmap
+
+
+def test_extend_matches_add():
+    rng = random.Random(2)
+    times, rates = [], []
+    t = 5000.0
+    for _ in range(4000):
+        t += rng.choice((0.5, 1.0, 1.0, 3.0))
+        times.append(t)
+        # Include idle samples and rates beyond both ends of the bucket range.
+        rates.append(rng.choice((0.0, 10.0, 2.0 ** rng.uniform(8, 34))))
+
+    a = Heatmap(columns=60, rows=48, bin_seconds=10.0)
+    for t, r in zip(times, rates):
+        a.add(t, r)
+    b = Heatmap(columns=60, rows=48, bin_seconds=10.0)
+    b.extend(times, rates)
+
+    assert a._col == b._col
+    assert (a._counts == b._counts).all()
+    assert (a.pixels == b.pixels).all()
+
+    # Live samples after the backfill keep both in step.
+    last = times[-1]
+    for t, r in ((last + 1.0, 5e5), (last + 12.0, 7e3), (last + 300.0, 0.0)):
+        a.add(t, r)
+        b.add(t, r)
+    assert (a.pixels == b.pixels).all()
@@ -0,0 +1,84 @@
+# test_history.py — Prepending older samples leaves History as if they had been appended.
+
+import random
+
+from history import History
+
+FIELDS = ("rx", "tx")
+
+
+def _samples(n, seed=1):
+    rng = random.Random(seed)
+    times = [1000.0 + i for i in range(n)]
+    values = [(rng.uniform(0, 1e6), rng.uniform(0, 1e5)) for _ in range(n)]
+    return times, values
+
+
+def _state(h):
+    return (
+        h._start,
+        list(h._times),
+        [list(c) for c in h._cols],
+        [(lvl[0], [list(a) for a in lvl[1]], [list(a) for a in lvl[2]]) for lvl in h._levels],
+    )
+
+
+def test_prepend_matches_append():
+    times, values = _samples(5000)
+    cut = 3333  # odd split, so the boundary lands inside blocks on several levels
+
+    # Reference: everything appended in order, at the global indices the
+    # prepended history will end up with.
+    ref = History(FIELDS, retention=1e9)
+    ref._start = -cut
+    for t, v in zip(times, values):
+        ref.append(t, v)
+
+    h = History(FIELDS, retention=1e9)
+    for t, v in zip(times[cut:], values[cut:]):
+        h.append(t, v)
+    # Newest chunk first, like the startup loader merges days.
+    for lo, hi in ((1700, cut), (301, 1700), (0, 301)):
+        h.prepend(times[lo:hi], [[v[i] for v in values[lo:hi]] for i in range(len(FIELDS))])
+
+    assert _state(h) == _state(ref)
+    for t0, t1, points in ((1000.0, 6000.0, 300), (1500.0, 4500.0, 64), (4000.0, 4100.0, 500)):
+        assert h.window(t0, t1, points) == ref.window(t0, t1, points)
+
+    # Both keep growing the same way afterwards.
+    for i in range(5000, 5100):
+        ref.append(1000.0 + i, (i, -i))
+        h.append(1000.0 + i, (i, -i))
+    assert _state(h) == _state(ref)
+
+
+def test_prepend_then_trim_matches_append():
+    times, values = _samples(20000, seed=3)
+    cut = 9001
+    retention = 12000.0
+
+    ref = History(FIELDS, retention=retention)
+    ref._start = -cut
+    h = History(FIELDS, retention=retention)
+    for t, v in zip(times[:cut + 100], values[:cut + 100]):
+        ref.append(t, v)
+    for t, v in zip(times[cut:cut + 100], values[cut:cut + 100]):
+        h.append(t, v)
+    # Many small chunks, newest first.
+    hi = cut
+    while hi > 0:
+        lo = max(0, hi - 517)
+        h.prepend(times[lo:hi], [[v[i] for v in values[lo:hi]] for i in range(len(FIELDS))])
+        hi = lo
+
+    for t, v in zip(times[cut + 100:], values[cut + 100:]):
+        ref.append(t, v)
+        h.append(t, v)
+        if int(t) % 997 == 0:
+            assert h.window(t - 5000, t, 200) == ref.window(t - 5000, t, 200)
+    assert _state(h) == _state(ref)
+    assert len(h) == len(ref)
+    assert (h.first_time, h.last_time, h.latest()) == (ref.first_time, ref.last_time, ref.latest())
+    for t in (0.0, 15000.5, 99999.0):
+        assert h.nearest(t) == ref.nearest(t)
+    assert h.raw("tx", 15000.0) == ref.raw("tx", 15000.0)
@@ -0,0 +1,54 @@
+# test_latency.py — Probes against local listeners: RTTs, lost probes and target spacing.
+
+import asyncio
+import socket
+
+import pytest
+
+from latency import DEFAULT_PORT, Prober, Target, parse_target
+
+
+def test_parse_target():
+    assert parse_target("example.com") == Target("example.com", DEFAULT_PORT)
+    assert parse_target(" example.com:8080 ") == Target("example.com", 8080)
+    assert parse_target("[::1]:22") == Target("::1", 22)
+    assert parse_target("fe80::1") == Target("fe80::1", DEFAULT_PORT)
+    for bad in ("bad:port:x", "host:0", "host:99999", "[::1", "[::1]x", ":80", "host:x"):
+        with pytest.raises(ValueError):
+            parse_target(bad)
+
+
+def _closed_port():
+    # Bound then closed, so nothing listens there and connects are refused.
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_prober_against_local_listeners():
+    interval = 0.4
+    results = []
+
+    async def main():
+        server = await asyncio.start_server(lambda r, w: w.close(), "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        targets = [f"127.0.0.1:{port}", f"127.0.0.1:{_closed_port()}"]
+        prober = Prober(targets, interval=interval, timeout=1.0)
+        task = asyncio.ensure_future(prober.run(results.append))
+        await asyncio.sleep(2.5 * interval)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        server.close()
+        await server.wait_closed()
+        return targets
+
+    up, down = asyncio.run(main())
+
+    ok = [r for r in results if r.target == up]
+    lost = [r for r in results if r.target == down]
+    assert len(ok) >= 2 and len(lost) >= 2
+    assert all(r.rtt is not None and 0 < r.rtt < 1.0 and not r.error for r in ok)
+    assert all(r.rtt is None and r.error for r in lost)
+    # Two targets are spread half an interval apart, each on its own grid.
+    assert ok[1].time - ok[0].time == pytest.approx(interval, abs=0.1)
+    assert lost[0].time - ok[0].time == pytest.approx(interval / 2, abs=0.1)
@@ -0,0 +1,42 @@
+# test_stream.py — A counter source that fails ends the stream with its error instead of a hang.
+
+import asyncio
+
+import pytest
+
+from sampling import SyntheticCounters, iter_samples, stream
+
+
+def _failing_source(calls):
+    # Fails on its `calls`-th read, like a NIC query that starts erroring.
+    counters = SyntheticCounters(interfaces=1)
+    n = 0
+
+    def source(*args, **kwargs):
+        nonlocal n
+        n += 1
+        if n == calls:
+            raise OSError("counters gone")
+        return counters(*args, **kwargs)
+
+    return source
+
+
+def test_async_stream_raises_source_error():
+    async def consume():
+        got = []
+        async for sample in stream(0.01, source=_failing_source(4)):
+            got.append(sample)
+        return got
+
+    with pytest.raises(OSError, match="counters gone"):
+        asyncio.run(asyncio.wait_for(consume(), 3))
+
+
+def test_sync_stream_raises_source_error():
+    got = []
+    with pytest.raises(OSError, match="counters gone"):
+        for sample in iter_samples(0.01, source=_failing_source(4)):
+            got.append(sample)
+    # The first read only primes the meter; reads 2 and 3 gave samples.
+    assert len(got) == 2
@@ -0,0 +1,81 @@
+# test_talkers.py — Unreadable processes are looked up once per stay in the connection table.
+
+from types import SimpleNamespace
+
+import psutil
+
+import talkers
+from talkers import TopTalkers
+
+
+class _Proc:
+    looked_up = []
+    denied_io = set()
+
+    def __init__(self, pid):
+        self.pid = pid
+        self.looked_up.append(pid)
+
+    def oneshot(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def create_time(self):
+        return 1.0
+
+    def name(self):
+        if self.pid == 3:
+            raise psutil.AccessDenied(self.pid)
+        return f"proc{self.pid}"
+
+    def io_counters(self):
+        if self.pid in self.denied_io:
+            raise psutil.AccessDenied(self.pid)
+        return SimpleNamespace(read_chars=1000, write_chars=100)
+
+
+def _conn(pid, port):
+    addr = SimpleNamespace(ip="10.0.0.1", port=port)
+    return SimpleNamespace(pid=pid, laddr=addr, raddr=addr)
+
+
+def test_access_denied_is_cached(monkeypatch):
+    monkeypatch.setattr(talkers.psutil, "Process", _Proc)
+    _Proc.looked_up = []
+    _Proc.denied_io = {2}
+    table = [_conn(1, 80), _conn(2, 81), _conn(3, 82)]
+    tt = TopTalkers(table_interval=0, table=talkers.ConnectionTable(connections=lambda kind: table))
+
+    for now in range(1, 6):
+        snap = tt.sample(now)
+    assert sorted(_Proc.looked_up) == [1, 2, 3]
+    assert [t.pid for t in snap.talkers] == [1]
+
+    # A PID that leaves the table and comes back is looked up afresh.
+    table.remove(_conn(2, 81))
+    tt.sample(6)
+    table.append(_conn(2, 81))
+    _Proc.denied_io = set()
+    tt.sample(7)
+    snap = tt.sample(8)
+    assert sorted(_Proc.looked_up) == [1, 2, 2, 3]
+    assert sorted(t.pid for t in snap.talkers) == [1, 2]
+
+
+class _NoIoProc(_Proc):
+    # Like psutil.Process on macOS, which has no io_counters().
+    io_counters = property(lambda self: self.missing)
+
+
+def test_missing_io_counters_is_reported(monkeypatch):
+    monkeypatch.setattr(talkers.psutil, "Process", _NoIoProc)
+    table = [_conn(1, 80), _conn(2, 81)]
+    tt = TopTalkers(table_interval=0, table=talkers.ConnectionTable(connections=lambda kind: table))
+    snap = tt.sample(1)
+    assert snap.talkers == [] and snap.endpoints == []
+    assert "platform" in snap.error
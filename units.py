@@ -0,0 +1,67 @@
+# units.py — Shared rate formatting: one precompiled formatter per (unit, precision).
+
+from functools import lru_cache
+
+UNITS = ("auto", "B/s", "KB/s", "MB/s", "b/s", "Kib/s", "Mib/s")
+
+# Display value per byte/s for each fixed unit.
+FACTORS = {
+    "B/s": 1.0,
+    "KB/s": 1 / 1024,
+    "MB/s": 1 / (1 << 20),
+    "b/s": 8.0,
+    "Kib/s": 8 / 1024,
+    "Mib/s": 8 / (1 << 20),
+}
+
+_MB = 1 << 20
+
+
+class Formatter:
+    """Turns bytes/s into display text for one unit/precision.
+
+    Built once per (unit, precision) and cached (see formatter()); text() is
+    then a multiply and a pre-bound str.format, with no branching on the unit.
+    "auto" shows MB/s from 1 MB/s up and KB/s below.
+    """
+
+    __slots__ = ("unit", "precision", "_steps")
+
+    def __init__(self, unit, precision):
+        if unit not in UNITS:
+            unit = "auto"
+        self.unit = unit
+        self.precision = precision
+        if unit == "auto":
+            names = (("MB/s", _MB), ("KB/s", 0))
+        else:
+            names = ((unit, 0),)
+        # (lower bound in bytes/s, factor, bound format) — first match wins.
+        self._steps = tuple(
+            (bound, FACTORS[name], f"{{:.{precision}f}} {name}".format)
+            for name, bound in names
+        )
+
+    def text(self, bps):
+        for bound, factor, fmt in self._steps:
+            if bps >= bound:
+                return fmt(bps * factor)
+        _, factor, fmt = self._steps[-1]
+        return fmt(bps * factor)
+
+
+@lru_cache(maxsize=None)
+def formatter(unit, precision):
+    return Formatter(unit, precision)
+
+
+# Alert thresholds are stored in MB/s; the settings dialog shows them in the
+# selected unit ("auto" stays MB/s).
+
+
+def mb_to_display(mb, unit):
+    return mb * _MB * FACTORS.get(unit, FACTORS["MB/s"])
+
+
+def display_to_mb(value, unit):
+    return value / (_MB * FACTORS.get(unit, FACTORS["MB/s"]))